@@ -0,0 +1,112 @@
+"""
+Generates synthetic markdown sites for benchmarking.
+
+Each shape stresses a different part of the pipeline:
+
+    many-small    lots of short pages (per-page overhead, template fill, writes)
+    few-huge      a handful of very long pages (block scanning, rendering)
+    inline-heavy  paragraphs dense with bold/italic/code/links/images
+    long-lists    pages made of long ordered and unordered lists
+    big-code      pages dominated by large fenced code blocks
+
+    python3 bench/corpus.py OUTPUT_DIR [--shape SHAPE] [--scale N] [--seed S]
+"""
+import argparse
+import os
+import random
+
+WORDS = (
+    "ring elf hobbit wizard shire road mountain river forest tower king "
+    "sword song light shadow journey friend fellowship council star stone"
+).split()
+
+SHAPES = {
+    # shape: (pages per unit of scale, sections per page)
+    "many-small": (500, 2),
+    "few-huge": (3, 1000),
+    "inline-heavy": (40, 40),
+    "long-lists": (40, 10),
+    "big-code": (40, 10),
+}
+
+
+def _words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def _inline(rng, count):
+    parts = []
+    for _ in range(count):
+        kind = rng.randrange(6)
+        word = rng.choice(WORDS)
+        if kind == 0:
+            parts.append(f"**{word}**")
+        elif kind == 1:
+            parts.append(f"_{word}_")
+        elif kind == 2:
+            parts.append(f"`{word}()`")
+        elif kind == 3:
+            parts.append(f"[{word}](/blog/{word})")
+        elif kind == 4:
+            parts.append(f"![{word}](/images/{word}.png)")
+        else:
+            parts.append(_words(rng, 3))
+    return " ".join(parts)
+
+
+def _section(rng, shape, index):
+    heading = f"## {_words(rng, 3).title()} {index}"
+    if shape == "inline-heavy":
+        body = "\n".join(_inline(rng, 12) for _ in range(4))
+    elif shape == "long-lists":
+        unordered = "\n".join(f"- {_inline(rng, 2)}" for _ in range(30))
+        ordered = "\n".join(f"{i}. {_words(rng, 5)}" for i in range(1, 31))
+        body = f"{unordered}\n\n{ordered}"
+    elif shape == "big-code":
+        code = "\n".join(f"    {rng.choice(WORDS)} = {rng.randrange(1000)}  # {_words(rng, 4)}" for _ in range(60))
+        body = f"{_words(rng, 20)}\n\n```\n{code}\n\n{code}\n```"
+    else:
+        body = f"{_words(rng, 30)} {_inline(rng, 3)}\n\n> {_words(rng, 12)}"
+    return f"{heading}\n\n{body}"
+
+
+def generate_corpus(shape, scale=1, seed=0):
+    """
+    Returns a sorted list of (relative_path, markdown) for a synthetic site.
+    The same arguments always produce the same corpus.
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown corpus shape: {shape}")
+    rng = random.Random(f"{shape}:{scale}:{seed}")
+    pages_per_scale, sections = SHAPES[shape]
+    pages = []
+    for page in range(pages_per_scale * scale):
+        body = "\n\n".join(_section(rng, shape, i) for i in range(sections))
+        markdown = f"# {_words(rng, 4).title()}\n\n{body}\n"
+        pages.append((os.path.join(shape, f"page{page:05d}", "index.md"), markdown))
+    return pages
+
+
+def write_corpus(pages, output_dir):
+    for rel_path, markdown in pages:
+        path = os.path.join(output_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(markdown)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic markdown site.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--shape", choices=sorted(SHAPES), action="append")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for shape in args.shape or sorted(SHAPES):
+        pages = generate_corpus(shape, args.scale, args.seed)
+        write_corpus(pages, args.output_dir)
+        print(f"{shape}: {len(pages)} pages, {sum(len(md) for _, md in pages) / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Measures how much memory parsed page trees take.
+
+Parses a synthetic document, then copies its HtmlNode tree and TextNode list
+twice, sharing the same strings: once with the slotted classes and once in the
+old layout (a __dict__ per instance and an empty children list per leaf).
+The difference is the per-node overhead the slotted classes save.
+
+    python3 bench/memory.py [paragraphs]
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from htmlnode import LeafNode, ParentNode  # noqa: E402
+from textnode import TextNode, markdown_to_html_node, text_to_textnodes  # noqa: E402
+
+
+class DictNode:
+    def __init__(self, tag, value, children, props):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+class DictTextNode:
+    def __init__(self, text, text_type, link):
+        self.text = text
+        self.text_type = text_type
+        self.link = link
+
+
+def copy_tree(node):
+    if isinstance(node, ParentNode):
+        return ParentNode(node.tag, [copy_tree(child) for child in node.children], node.value, node.props)
+    return LeafNode(node.tag, node.value, node.props)
+
+
+def to_dict_layout(node):
+    if isinstance(node, ParentNode):
+        return DictNode(node.tag, node.value, [to_dict_layout(child) for child in node.children], node.props)
+    return DictNode(node.tag, node.value, [], node.props)
+
+
+def sample_markdown(paragraphs):
+    block = (
+        "Here is **bold** and _italic_ text with `code` and a [link](/blog/tom) "
+        "plus an ![image](/images/tom.png) in the middle of a sentence."
+    )
+    items = "\n".join(f"- item {i} with **emphasis**" for i in range(10))
+    return "\n\n".join(f"# Heading {i}\n\n{block}\n\n{items}" for i in range(paragraphs))
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    paragraphs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    markdown = sample_markdown(paragraphs)
+    text = " ".join(markdown.splitlines())
+
+    tree = markdown_to_html_node(markdown)
+    nodes = text_to_textnodes(text)
+
+    _, tree_bytes = measure(lambda: copy_tree(tree))
+    _, dict_tree_bytes = measure(lambda: to_dict_layout(tree))
+    _, text_bytes = measure(lambda: [TextNode(n.text, n.text_type, n.link) for n in nodes])
+    _, dict_text_bytes = measure(lambda: [DictTextNode(n.text, n.text_type, n.link) for n in nodes])
+
+    print(f"HtmlNode tree:  {tree_bytes / 1e6:8.2f} MB (dict layout {dict_tree_bytes / 1e6:8.2f} MB)")
+    print(f"TextNode list:  {text_bytes / 1e6:8.2f} MB (dict layout {dict_text_bytes / 1e6:8.2f} MB)")
+    print(f"Reduction:      {1 - tree_bytes / dict_tree_bytes:.0%} (HtmlNode), {1 - text_bytes / dict_text_bytes:.0%} (TextNode)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Times each stage of the build pipeline on synthetic corpora and compares the
+results against stored baselines.
+
+Stages: blocks (block scanning), inline (inline parsing), render (HTML
+rendering), template (template fill) and write (writing pages to disk).
+Each stage reports the best of --repeat runs after a warm-up run.
+
+    python3 bench/run.py                      compare against bench/baseline.json
+    python3 bench/run.py --save               store the current timings as the baseline
+    python3 bench/run.py --threshold 0.25     fail if any stage is 25% slower than its baseline
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from corpus import SHAPES, generate_corpus  # noqa: E402
+from template import Template  # noqa: E402
+from textnode import BlockType, iter_blocks, markdown_to_html_node, text_to_textnodes  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+TEMPLATE = os.path.join(BENCH_DIR, "..", "template.html")
+INLINE_BLOCKS = (BlockType.PARAGRAPH, BlockType.HEADING, BlockType.QUOTE, BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST)
+
+
+def best_of(fn, repeat):
+    """
+    Returns the fastest of repeat timed runs, after one untimed warm-up run,
+    with the garbage collector paused so its pauses don't land in a stage.
+    """
+    fn()
+    best = None
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        gc.enable()
+    return best
+
+
+def time_stages(pages, template, repeat):
+    """
+    Returns {stage: seconds} for one corpus.
+    """
+    sources = [markdown.split("\n") for _, markdown in pages]
+    inline_texts = [
+        " ".join(lines)
+        for page_lines in sources
+        for btype, lines in iter_blocks(page_lines)
+        if btype in INLINE_BLOCKS
+    ]
+    trees = [markdown_to_html_node(markdown) for _, markdown in pages]
+    contents = [tree.to_html() for tree in trees]
+
+    def fill_templates():
+        for content in contents:
+            template.render_to(io.StringIO(), {"Title": "Title", "Content": content})
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        paths = [os.path.join(output_dir, f"page{i}.html") for i in range(len(contents))]
+
+        def write_pages():
+            for path, content in zip(paths, contents):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(content)
+
+        return {
+            "blocks": best_of(lambda: [list(iter_blocks(lines)) for lines in sources], repeat),
+            "inline": best_of(lambda: [text_to_textnodes(text) for text in inline_texts], repeat),
+            "render": best_of(lambda: [tree.to_html() for tree in trees], repeat),
+            "template": best_of(fill_templates, repeat),
+            "write": best_of(write_pages, repeat),
+        }
+
+
+def compare(results, baseline, threshold, min_seconds=0.01):
+    """
+    Prints a table of results against the baseline and returns the list of
+    "shape/stage" entries that regressed by more than threshold.
+    Stages faster than min_seconds are too noisy to fail a run.
+    """
+    regressions = []
+    print(f"{'corpus':<14}{'stage':<10}{'seconds':>10}{'baseline':>10}{'change':>9}")
+    for shape, stages in results.items():
+        for stage, seconds in stages.items():
+            base = baseline.get(shape, {}).get(stage)
+            if base:
+                change = seconds / base - 1
+                flag = "  REGRESSION" if change > threshold and seconds > min_seconds else ""
+                print(f"{shape:<14}{stage:<10}{seconds:>10.4f}{base:>10.4f}{change:>+9.0%}{flag}")
+                if flag:
+                    regressions.append(f"{shape}/{stage}")
+            else:
+                print(f"{shape:<14}{stage:<10}{seconds:>10.4f}{'-':>10}{'-':>9}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the build pipeline stage by stage.")
+    parser.add_argument("--shape", choices=sorted(SHAPES), action="append", help="corpus shapes to run (default: all)")
+    parser.add_argument("--scale", type=int, default=1, help="corpus size multiplier")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per stage; the best is kept")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file to compare against or save to")
+    parser.add_argument("--save", action="store_true", help="store these timings as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown per stage before failing")
+    parser.add_argument("--min-seconds", type=float, default=0.01, help="stages faster than this never fail the run")
+    args = parser.parse_args(argv)
+
+    with open(TEMPLATE, "r", encoding="utf-8") as f:
+        template = Template(f.read())
+
+    results = {}
+    for shape in args.shape or sorted(SHAPES):
+        results[shape] = time_stages(generate_corpus(shape, args.scale), template, args.repeat)
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+    regressions = compare(results, baseline, args.threshold, args.min_seconds)
+    if regressions:
+        print(f"Regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
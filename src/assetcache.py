@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+
+from manifest import hash_file
+from parsecache import CACHE_DIR
+
+
+class AssetTransform:
+    """
+    Publishes transformed copies of static files (optimized, minified, ...).
+    Each result is computed once per distinct content and kept under
+    <cache root>/assets, keyed by the source's hash and the transform's name
+    and version. Subclasses set extensions, name and version and implement transform.
+    """
+
+    extensions = ()
+    name = "transform"
+    version = "1"
+    errors = (ValueError,)
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+        self.dir = os.path.join(root, "assets")
+
+    def handles(self, path):
+        return os.path.splitext(path)[1].lower() in self.extensions
+
+    def transform(self, data: bytes) -> bytes:
+        raise NotImplementedError()
+
+    def source_for(self, src_path, hash_of=hash_file):
+        """
+        Returns the file to publish for src_path: the cached transformed copy
+        (computing it first if needed) for files this transform handles,
+        src_path itself for anything else or if the transform fails.
+        """
+        if not self.handles(src_path):
+            return src_path
+        ext = os.path.splitext(src_path)[1]
+        path = os.path.join(self.dir, f"{hash_of(src_path)}.{self.name}{self.version}{ext}")
+        if os.path.exists(path):
+            return path
+
+        with open(src_path, "rb") as f:
+            data = f.read()
+        try:
+            result = self.transform(data)
+        except self.errors as e:
+            print(f"Not transforming {src_path} ({self.name}): {e}")
+            return src_path
+        os.makedirs(self.dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(result)
+        # mkstemp files are private; published copies keep the source's mode
+        shutil.copymode(src_path, tmp_path)
+        os.replace(tmp_path, path)
+        print(f"{self.name.capitalize()}: {src_path} {len(data)} -> {len(result)} bytes")
+        return path
+
+
+def chain_sources(transforms, hash_of=hash_file):
+    """
+    Returns a source_for function (see copyutil.sync_static) that applies the
+    first of transforms that handles each file, or None if there are none.
+    """
+    transforms = [transform for transform in transforms if transform is not None]
+    if not transforms:
+        return None
+
+    def source_for(src_path):
+        for transform in transforms:
+            if transform.handles(src_path):
+                return transform.source_for(src_path, hash_of)
+        return src_path
+
+    return source_for
@@ -0,0 +1,97 @@
+import json
+import os
+
+from manifest import hash_bytes, hash_file
+from pngopt import image_size
+from urls import is_root_relative, split_path
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+HASH_LENGTH = 10
+# Files browsers and crawlers request by fixed name (favicon.ico, robots.txt,
+# pages) keep their names; everything a page links to gets a fingerprint
+FINGERPRINT_EXTENSIONS = {
+    ".css", ".js", ".mjs", ".map", ".json",
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".avif",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot",
+    ".mp4", ".webm", ".mp3", ".ogg", ".pdf",
+}
+
+
+def fingerprint_name(rel_path: str, digest: str) -> str:
+    """
+    Returns rel_path with the content hash before its extension: index.css -> index.<hash>.css
+    """
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+
+class AssetManifest:
+    """
+    Maps static files (paths relative to the static directory, / separated)
+    to the fingerprinted names they are published under, and images to their
+    (width, height). Instances compare and hash by content, so they can key
+    caches and build settings.
+    """
+
+    def __init__(self, files=None, sizes=None):
+        self.files = dict(files or {})
+        self.sizes = {path: tuple(size) for path, size in (sizes or {}).items()}
+        state = {"files": self.files, "sizes": self.sizes}
+        self.digest = hash_bytes(json.dumps(state, sort_keys=True).encode("utf-8"))
+
+    @classmethod
+    def build(cls, static_dir, rel_paths, hash_of=hash_file, fingerprint=True, measure_images=False, source_for=None):
+        """
+        source_for maps a static file to the file published in its place (see
+        copyutil.sync_static); fingerprints hash that, so a transformed copy
+        never shares a name with different bytes.
+        """
+        files = {}
+        sizes = {}
+        for rel_path in rel_paths:
+            url_path = rel_path.replace(os.sep, "/")
+            ext = os.path.splitext(rel_path)[1].lower()
+            if fingerprint and ext in FINGERPRINT_EXTENSIONS:
+                src_path = os.path.join(static_dir, rel_path)
+                if source_for is not None:
+                    src_path = source_for(src_path)
+                files[url_path] = fingerprint_name(url_path, hash_of(src_path))
+            if measure_images and ext == ".png":
+                size = image_size(os.path.join(static_dir, rel_path))
+                if size:
+                    sizes[url_path] = size
+        return cls(files, sizes)
+
+    def get(self, url_path, default=None):
+        return self.files.get(url_path, default)
+
+    def size_for(self, url):
+        """
+        Returns (width, height) of the image a root-relative URL points at, if known.
+        """
+        if not self.sizes or not is_root_relative(url):
+            return None
+        return self.sizes.get(split_path(url)[0])
+
+    def output_name(self, rel_path):
+        """
+        Returns the path, relative to the output directory, that rel_path is published under.
+        """
+        return self.files.get(rel_path.replace(os.sep, "/"), rel_path)
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.files, f, indent=2, sort_keys=True)
+
+    def __bool__(self):
+        return bool(self.files or self.sizes)
+
+    def __eq__(self, other):
+        return isinstance(other, AssetManifest) and self.digest == other.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        return f"AssetManifest({len(self.files)} files, {self.digest[:HASH_LENGTH]})"
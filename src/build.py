@@ -0,0 +1,380 @@
+from assetcache import chain_sources
+from assets import ASSET_MANIFEST_NAME, AssetManifest
+from copyutil import list_files, sync_static
+from feeds import FEED_NAME, SITEMAP_NAME, SITEMAP_PART, write_feed, write_sitemap
+from linkcheck import BrokenLinksError, check_references, output_index, report
+from deploy import scan_outputs, write_output_manifest
+from manifest import MANIFEST_NAME, HashCache, build_settings, load_manifest, plan_incremental_build, record_page, remove_output, save_manifest
+from precompress import CODECS, precompress_outputs
+from search import SEARCH_DIR, write_search_index
+from shards import apply_merge, plan_merge, select_shard
+from template import resolve_template
+from urls import UrlResolver, page_url
+from utils import generate_pages
+import contextlib
+import shutil
+import os
+
+
+def normalize_basepath(basepath):
+    if not basepath.startswith("/"):
+        basepath = "/" + basepath
+    if not basepath.endswith("/"):
+        basepath += "/"
+    return basepath
+
+
+def discover_pages(content_dir, output_dir):
+    """
+    Walks content_dir and returns a sorted list of (md_path, dest_path) tuples,
+    one for every markdown file.
+    """
+    pages = []
+    for root, dirs, files in os.walk(content_dir):
+        for file in files:
+            if file.endswith(".md"):
+                md_path = os.path.join(root, file)
+                pages.append((md_path, page_output_path(md_path, content_dir, output_dir)))
+    return sorted(pages)
+
+
+def page_output_path(md_path, content_dir, output_dir):
+    rel_path = os.path.relpath(md_path, content_dir)  # ex: blog/foo.md
+    html_path = os.path.splitext(rel_path)[0] + ".html"
+    return os.path.join(output_dir, html_path)
+
+
+def build_site(
+    basepath="/",
+    output_dir="docs",
+    content_dir="content",
+    static_dir="static",
+    template_path="template.html",
+    layouts_dir="layouts",
+    incremental=False,
+    jobs=1,
+    link_assets="copy",
+    hash_assets=False,
+    site_url=None,
+    relative_urls=False,
+    parse_cache=None,
+    fingerprint_assets=False,
+    image_optimizer=None,
+    css_minifier=None,
+    minify_html=False,
+    precompress=(),
+    output_manifest=None,
+    search=False,
+    sitemap=False,
+    feed_section=None,
+    check_links=False,
+    strict_links=False,
+    shard=None,
+    merge_shards_from=(),
+    tracer=None,
+):
+    """
+    Builds the whole site into output_dir. Outputs are only rewritten when their
+    content changed, and those the last build (per the manifest) produced but
+    this one doesn't are removed. With incremental set, only pages and assets
+    whose inputs changed since the last build are redone.
+    Root-relative URLs are prefixed with basepath, or with site_url + basepath
+    when site_url is given, or made relative to each page with relative_urls.
+    A parsecache.ParseCache lets unchanged documents skip parsing.
+    fingerprint_assets, image_optimizer (a pngopt.PngOptimizer), css_minifier
+    (a minify.CssMinifier) and minify_html change how assets and pages are
+    published. shard, an (i, N) pair, builds only the i-th of N slices of the
+    pages, and merge_shards_from merges the output directories of all N shards
+    instead of generating pages (see shards.py).
+    The site-wide passes after the pages each have a helper: search
+    (write_search), sitemap and feed_section (write_site_feeds, which need
+    site_url), precompress (compress_site), check_links (check_site_links;
+    strict_links raises linkcheck.BrokenLinksError once the output and manifest
+    are written) and output_manifest (write_outputs_manifest).
+    A buildtrace.BuildTrace passed as tracer collects phase and per-page timings.
+    Raises PageGenerationError if a page fails; the manifest is then left untouched.
+    """
+    if (sitemap or feed_section) and not site_url:
+        raise ValueError("A sitemap or feed needs the site's absolute URL (site_url)")
+    unknown_codecs = [codec for codec in precompress if codec not in CODECS]
+    if unknown_codecs:
+        # Checked up front, not once every page has been built
+        raise ValueError(f"Unknown compression codec: {', '.join(unknown_codecs)}")
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    resolver = UrlResolver(basepath, site_url, relative_urls)
+    phase = tracer.phase if tracer is not None else (lambda name: contextlib.nullcontext())
+
+    hash_of = HashCache()
+
+    def template_for(md_path):
+        return resolve_template(os.path.relpath(md_path, content_dir), template_path, layouts_dir)
+
+    source_for = chain_sources([image_optimizer, css_minifier], hash_of)
+
+    # Planning writes nothing to output_dir, so a bad merge or plan fails before anything is
+    with phase("plan"):
+        asset_manifest = None
+        if fingerprint_assets or image_optimizer is not None:
+            asset_manifest = AssetManifest.build(
+                static_dir,
+                list_files(static_dir),
+                hash_of,
+                fingerprint=fingerprint_assets,
+                measure_images=image_optimizer is not None,
+                source_for=source_for,
+            )
+        # A full build also starts from the last manifest: it redoes every page,
+        # but removes only stale outputs and leaves unchanged files untouched
+        previous = load_manifest(manifest_path)
+        last_pages = previous["pages"]
+        settings = build_settings(
+            **resolver.settings(),
+            assets=asset_manifest.digest if asset_manifest else None,
+            minify_html=minify_html,
+            search=search,
+        )
+        pages = discover_pages(content_dir, output_dir)
+        if merge_shards_from:
+            to_build, to_delete, manifest = [], [], {"settings": settings, "pages": {}}
+            manifest["pages"], merge_copies = plan_merge(merge_shards_from, output_dir, settings, pages)
+        else:
+            if shard is not None:
+                site_pages = len(pages)
+                pages = select_shard(pages, content_dir, shard)
+                print(f"Shard {shard[0]}/{shard[1]}: {len(pages)} of {site_pages} pages")
+            to_build, to_delete, manifest = plan_incremental_build(
+                pages,
+                previous,
+                settings,
+                inputs_for=lambda md_path: [md_path, template_for(md_path)],
+                hash_of=hash_of,
+                rebuild_all=not incremental,
+            )
+        if shard is not None:
+            manifest["shard"] = list(shard)
+            # Where page outputs are recorded relative to, so the shard can be moved before merging
+            manifest["output_dir"] = output_dir
+
+    with phase("static"):
+        if shard is not None:
+            # Published once, by the merge
+            assets = []
+        else:
+            assets = sync_static(
+                src=static_dir,
+                dest=output_dir,
+                previous=previous.get("assets", []),
+                compare="hash" if hash_assets or not incremental else "mtime",
+                link_mode=link_assets,
+                output_name=asset_manifest.output_name if asset_manifest is not None else None,
+                source_for=source_for,
+            )
+        asset_manifest_path = os.path.join(output_dir, ASSET_MANIFEST_NAME)
+        if fingerprint_assets and shard is None:
+            asset_manifest.write(asset_manifest_path)
+        elif os.path.exists(asset_manifest_path):
+            os.remove(asset_manifest_path)
+
+    if merge_shards_from:
+        with phase("merge"):
+            apply_merge(output_dir, manifest["pages"], merge_copies, previous["pages"])
+
+    for dest_path in to_delete:
+        print(f"Removing stale page {dest_path}")
+        remove_output(dest_path, output_dir)
+
+    def reusable(md_path, key):
+        # A page rebuilt from an unchanged source (e.g. for a new template) keeps its metadata
+        entry = last_pages.get(md_path, {})
+        if key in entry and entry["inputs"].get(md_path) == hash_of(md_path):
+            return entry[key]
+        return None
+
+    def needs_terms(md_path):
+        return search and reusable(md_path, "terms") is None
+
+    with phase("pages"):
+        records = generate_pages(
+            [(md_path, template_for(md_path), dest_path) for md_path, dest_path in to_build],
+            url_prefix=lambda dest_path: resolver.prefix_for(os.path.relpath(dest_path, output_dir)),
+            jobs=jobs,
+            trace=tracer is not None,
+            parse_cache=parse_cache,
+            assets=asset_manifest,
+            minify=minify_html,
+            index_text=needs_terms,
+        )
+        if parse_cache is not None:
+            parse_cache.prune()
+    changed = 0
+    page_hashes = {}
+    for md_path, dest_path in to_build:
+        record = records[md_path]
+        if tracer is not None:
+            tracer.add_page(record.pop("trace"))
+        changed += record.pop("changed")
+        page_hashes[os.path.relpath(dest_path, output_dir)] = record.pop("hash")
+        record_page(manifest, md_path, dest_path, record, hash_of)
+        entry = manifest["pages"][md_path]
+        entry["title"] = record["title"]
+        entry["relative_links"] = record["relative_links"]
+        entry["images"] = record["images"]
+        # When the source's current content was first built, for the sitemap and feeds
+        entry["updated"] = reusable(md_path, "updated") or os.stat(md_path).st_mtime
+        if "terms" in record:
+            entry["terms"] = record["terms"]
+        elif search:
+            entry["terms"] = reusable(md_path, "terms")
+    if not merge_shards_from:
+        print(f"Built {len(to_build)} of {len(pages)} pages ({changed} changed on disk)")
+
+    # Build bookkeeping that lives in the output tree but isn't part of the site
+    bookkeeping = {MANIFEST_NAME}
+    if output_manifest is not None:
+        bookkeeping.add(os.path.relpath(output_manifest, output_dir))
+    # Shards leave the site-wide outputs to the merge
+    site_wide = shard is None
+
+    def phase_if(name, enabled):
+        # Passes that only clean up after a previous build aren't traced
+        return phase(name) if enabled else contextlib.nullcontext()
+
+    with phase_if("search", search and site_wide):
+        write_search(output_dir, manifest, previous, search and site_wide)
+    with phase_if("feeds", site_wide and (sitemap or feed_section)):
+        write_site_feeds(
+            output_dir,
+            content_dir,
+            resolver.site_url + basepath if site_url else None,
+            manifest,
+            previous,
+            sitemap and site_wide,
+            feed_section if site_wide else None,
+        )
+    if site_wide:
+        with phase_if("compress", precompress or previous.get("compressed")):
+            compress_site(output_dir, bookkeeping, manifest, previous, precompress, jobs, hash_of)
+    problems = []
+    if site_wide and (check_links or strict_links):
+        with phase("check"):
+            problems = check_site_links(output_dir, bookkeeping, manifest, asset_manifest)
+
+    with phase("manifest"):
+        if output_manifest is not None and site_wide:
+            write_outputs_manifest(output_manifest, output_dir, bookkeeping, manifest, previous, page_hashes, hash_of)
+        manifest["assets"] = assets
+        save_manifest(manifest_path, manifest)
+    if problems and strict_links:
+        raise BrokenLinksError(f"{len(problems)} broken links or images")
+
+
+def site_outputs(output_dir, bookkeeping):
+    """
+    Lists the files in output_dir that are part of the site, leaving out the
+    build's bookkeeping files.
+    """
+    return [rel_path for rel_path in list_files(output_dir) if rel_path not in bookkeeping]
+
+
+def write_search(output_dir, manifest, previous, enabled):
+    """
+    Writes a full-text index of the pages to output_dir/search (see
+    search.write_search_index) from the terms kept in each page's manifest
+    entry, or removes the index a previous build left when not enabled.
+    """
+    if enabled:
+        manifest["search_ids"] = write_search_index(
+            output_dir,
+            {
+                md_path: (os.path.relpath(entry["output"], output_dir), entry["title"], entry["terms"])
+                for md_path, entry in manifest["pages"].items()
+            },
+            previous.get("search_ids"),
+        )
+    elif previous.get("search_ids") and os.path.isdir(os.path.join(output_dir, SEARCH_DIR)):
+        shutil.rmtree(os.path.join(output_dir, SEARCH_DIR))
+
+
+def write_site_feeds(output_dir, content_dir, base_url, manifest, previous, sitemap, feed_section):
+    """
+    With sitemap, writes sitemap.xml, and with feed_section (a directory of
+    content, e.g. "blog"), an Atom feed of the pages below it at
+    <section>/atom.xml, both from the titles and update times in manifest's
+    page entries, noting what was written in it. A sitemap or feed the
+    previous build wrote but this one doesn't is removed.
+    """
+    pages = manifest["pages"]
+    if sitemap:
+        write_sitemap(
+            output_dir,
+            base_url,
+            [(os.path.relpath(entry["output"], output_dir), entry["updated"]) for entry in pages.values()],
+        )
+        manifest["sitemap"] = True
+    if feed_section:
+        section = feed_section.strip("/")
+        section_index = os.path.join(content_dir, section, "index.md")
+        site_index = os.path.join(content_dir, "index.md")
+        entries = []
+        for md_path, entry in pages.items():
+            rel_path = os.path.relpath(md_path, content_dir).replace(os.sep, "/")
+            if rel_path.startswith(section + "/") and md_path != section_index:
+                url = base_url + page_url(os.path.relpath(entry["output"], output_dir))
+                entries.append((url, entry["title"], entry["updated"]))
+        feed_path = os.path.join(section, FEED_NAME)
+        write_feed(
+            os.path.join(output_dir, feed_path),
+            base_url + feed_path.replace(os.sep, "/"),
+            base_url + section + "/",
+            pages[section_index]["title"] if section_index in pages else section,
+            pages[site_index]["title"] if site_index in pages else base_url,
+            entries,
+        )
+        manifest["feed"] = feed_path
+    if previous.get("sitemap") and not manifest.get("sitemap"):
+        for name in os.listdir(output_dir):
+            if name == SITEMAP_NAME or SITEMAP_PART.fullmatch(name):
+                os.remove(os.path.join(output_dir, name))
+    if previous.get("feed") and previous["feed"] != manifest.get("feed"):
+        remove_output(os.path.join(output_dir, previous["feed"]), output_dir)
+
+
+def compress_site(output_dir, bookkeeping, manifest, previous, codecs, jobs, hash_of):
+    """
+    Writes compressed siblings of the site's HTML, CSS and JS outputs with
+    each of codecs (e.g. ("gz",)); unchanged outputs keep their siblings, and
+    those the previous build wrote but this one doesn't are removed.
+    """
+    if not codecs and not previous.get("compressed"):
+        return
+    outputs = site_outputs(output_dir, bookkeeping)
+    compressed = precompress_outputs(output_dir, outputs, previous.get("compressed"), codecs=codecs, jobs=jobs, hash_of=hash_of)
+    if compressed:
+        manifest["compressed"] = compressed
+
+
+def check_site_links(output_dir, bookkeeping, manifest, asset_manifest):
+    """
+    Checks every internal link and image of every page against the site's
+    outputs and reports dangling ones with their source file and line.
+    Returns the problems.
+    """
+    index = output_index(site_outputs(output_dir, bookkeeping))
+    if asset_manifest is not None:
+        # Pages refer to static files by their source names
+        index.update(output_index(asset_manifest.files))
+    problems = check_references(manifest["pages"], output_dir, index)
+    report(problems)
+    return problems
+
+
+def write_outputs_manifest(path, output_dir, bookkeeping, manifest, previous, page_hashes, hash_of):
+    """
+    Lists every file of the site (size, hash, content type) at path, for
+    deploy.diff_manifests. Pages written this build (page_hashes) aren't read
+    back, and other files are only hashed when their size or mtime changed.
+    """
+    outputs = site_outputs(output_dir, bookkeeping)
+    files, manifest["outputs"] = scan_outputs(output_dir, outputs, known=page_hashes, previous=previous.get("outputs"), hash_of=hash_of)
+    write_output_manifest(path, files)
+    print(f"Wrote output manifest ({len(files)} files) to {path}")
@@ -0,0 +1,193 @@
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PAGE_STAGES = ("read", "parse_blocks", "parse_inline", "render", "template", "write")
+
+
+class PageTrace:
+    """
+    Accumulates wall time per stage for one page. Stages may nest; each stage
+    is charged only its exclusive time, so the stage totals add up to the page.
+    """
+
+    def __init__(self, page, stop_tracemalloc=False):
+        self.page = page
+        self.stages = dict.fromkeys(PAGE_STAGES, 0.0)
+        self.start_us = time.time_ns() // 1000
+        self.duration = 0.0
+        self.peak_bytes = None
+        self.pid = os.getpid()
+        self._started = time.perf_counter()
+        self._stack = []
+        # Set when this trace started tracemalloc, so finish() stops it again
+        self._stop_tracemalloc = stop_tracemalloc
+
+    def begin(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def end(self):
+        name, started, nested = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed - nested
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    @contextmanager
+    def stage(self, name):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def timed(self, name, fn):
+        def wrapper(*args, **kwargs):
+            self.begin(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.end()
+        return wrapper
+
+    def timed_iter(self, name, iterable):
+        """
+        Wraps an iterator so only the time spent producing items is charged to name.
+        """
+        iterator = iter(iterable)
+        while True:
+            self.begin(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.end()
+            yield item
+
+    def timed_writer(self, out, name="write"):
+        return _TimedWriter(self, out, name)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._started
+        if tracemalloc.is_tracing():
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            if self._stop_tracemalloc:
+                # Later pages and build phases shouldn't pay for allocation tracing
+                tracemalloc.stop()
+                self._stop_tracemalloc = False
+        return self
+
+    def to_dict(self):
+        return {
+            "page": self.page,
+            "pid": self.pid,
+            "start_us": self.start_us,
+            "duration": self.duration,
+            "stages": self.stages,
+            "peak_bytes": self.peak_bytes,
+        }
+
+
+class _TimedWriter:
+    def __init__(self, trace, out, name):
+        self.trace = trace
+        self.out = out
+        self.name = name
+
+    def write(self, chunk):
+        self.trace.begin(self.name)
+        try:
+            self.out.write(chunk)
+        finally:
+            self.trace.end()
+
+
+def start_page_trace(page):
+    """
+    Starts tracing one page, including its allocation peak. Allocation tracing
+    started here stops again at the trace's finish().
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    return PageTrace(page, stop_tracemalloc=started)
+
+
+class BuildTrace:
+    """
+    Collects build phases and page traces and reports them as a Chrome trace
+    (chrome://tracing, Perfetto) or a plain summary.
+    """
+
+    def __init__(self):
+        self.phases = []
+        self.pages = []
+
+    @contextmanager
+    def phase(self, name):
+        start_us = time.time_ns() // 1000
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({"name": name, "start_us": start_us, "duration": time.perf_counter() - started})
+
+    def add_page(self, page_trace: dict):
+        self.pages.append(page_trace)
+
+    def stage_totals(self):
+        totals = dict.fromkeys(PAGE_STAGES, 0.0)
+        for page in self.pages:
+            for stage, seconds in page["stages"].items():
+                totals[stage] = totals.get(stage, 0.0) + seconds
+        return totals
+
+    def slowest_pages(self, count=10):
+        return sorted(self.pages, key=lambda page: page["duration"], reverse=True)[:count]
+
+    def to_chrome_trace(self):
+        events = []
+        pid = os.getpid()
+        for phase in self.phases:
+            events.append({
+                "name": phase["name"], "cat": "build", "ph": "X", "pid": pid, "tid": 0,
+                "ts": phase["start_us"], "dur": phase["duration"] * 1e6,
+            })
+        for page in self.pages:
+            args = {stage: round(seconds * 1e3, 3) for stage, seconds in page["stages"].items()}
+            if page["peak_bytes"] is not None:
+                args["peak_kb"] = round(page["peak_bytes"] / 1024, 1)
+            events.append({
+                "name": page["page"], "cat": "page", "ph": "X", "pid": page["pid"], "tid": 1,
+                "ts": page["start_us"], "dur": page["duration"] * 1e6, "args": args,
+            })
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "summary": {
+                "stages": self.stage_totals(),
+                "slowest": [{"page": p["page"], "duration": p["duration"], "peak_bytes": p["peak_bytes"]}
+                            for p in self.slowest_pages()],
+            },
+        }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def summary(self, count=10):
+        lines = ["Build phases:"]
+        for phase in self.phases:
+            lines.append(f"  {phase['name']:<14}{phase['duration'] * 1e3:10.1f} ms")
+        lines.append("Page stages (all pages):")
+        for stage, seconds in self.stage_totals().items():
+            lines.append(f"  {stage:<14}{seconds * 1e3:10.1f} ms")
+        lines.append(f"Slowest pages (of {len(self.pages)}):")
+        for page in self.slowest_pages(count):
+            peak = f"{page['peak_bytes'] / 1024:10.1f} KB peak" if page["peak_bytes"] is not None else ""
+            lines.append(f"  {page['duration'] * 1e3:10.1f} ms {peak}  {page['page']}")
+        return "\n".join(lines)
@@ -1,25 +1,116 @@
 import os
 import shutil
 
-def copy_static_to_public(src="static", dest="public"):
+from manifest import hash_file, remove_output
+
+
+FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+
+
+def _reflink(src_path, dest_path):
+    import fcntl
+
+    with open(src_path, "rb") as src_file, open(dest_path, "wb") as dest_file:
+        fcntl.ioctl(dest_file.fileno(), FICLONE, src_file.fileno())
+    shutil.copystat(src_path, dest_path)
+
+
+def _place_file(src_path, dest_path, link_mode):
+    """
+    Puts src_path at dest_path by hardlink, reflink or copy, falling back to a
+    plain copy when the filesystem can't link.
+    """
+    if os.path.lexists(dest_path):
+        os.remove(dest_path)
+    if link_mode == "hardlink":
+        try:
+            os.link(src_path, dest_path)
+            return
+        except OSError:
+            pass
+    elif link_mode == "reflink":
+        try:
+            _reflink(src_path, dest_path)
+            return
+        except (OSError, ImportError):
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+    shutil.copy2(src_path, dest_path)
+
+
+def _is_current(src_path, dest_path, compare):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src_path)
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if compare == "hash":
+        return hash_file(src_path) == hash_file(dest_path)
+    return src_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+
+def list_files(root):
     """
-    Recursively copies all files and directories from src to dest,
-    after first deleting all contents in dest (if it exists).
-    Logs the path of every copied file.
+    Returns the sorted paths, relative to root, of every file below root.
     """
-    if os.path.exists(dest):
-        shutil.rmtree(dest)
-    os.makedirs(dest, exist_ok=True)
-
-    def recursive_copy(current_src, current_dest):
-        for name in os.listdir(current_src):
-            src_path = os.path.join(current_src, name)
-            dest_path = os.path.join(current_dest, name)
-            if os.path.isdir(src_path):
-                os.makedirs(dest_path, exist_ok=True)
-                recursive_copy(src_path, dest_path)
-            else:
-                shutil.copy(src_path, dest_path)
-                print(f"Copied: {src_path} -> {dest_path}")
-
-    recursive_copy(src, dest)
\ No newline at end of file
+    paths = []
+    for current, dirs, files in os.walk(root):
+        for name in files:
+            paths.append(os.path.relpath(os.path.join(current, name), root))
+    return sorted(paths)
+
+
+def sync_static(
+    src="static",
+    dest="public",
+    previous=(),
+    compare="mtime",
+    link_mode="copy",
+    output_name=None,
+    source_for=None,
+):
+    """
+    Brings dest up to date with src without wiping it: only new or changed files
+    (by size and mtime, or by content hash when compare="hash") are copied, and
+    files listed in previous that are no longer produced are removed.
+    Other files in dest, such as generated pages, are left alone.
+    output_name maps a file's path relative to src to its path in dest
+    (e.g. assets.AssetManifest.output_name); by default it is unchanged.
+    source_for maps a source file to the file published in its place, such as
+    an optimized copy (e.g. pngopt.PngOptimizer.source_for).
+    Returns the relative paths, in dest, of all files synced from src.
+    """
+    sources = list_files(src)
+    current = []
+    copied = 0
+    made_dirs = set()
+    for rel_path in sources:
+        out_path = output_name(rel_path) if output_name else rel_path
+        current.append(out_path)
+        src_path = os.path.join(src, rel_path)
+        if source_for is not None:
+            src_path = source_for(src_path)
+        dest_path = os.path.join(dest, out_path)
+        if _is_current(src_path, dest_path, compare):
+            continue
+        parent = os.path.dirname(dest_path)
+        if parent not in made_dirs:
+            os.makedirs(parent, exist_ok=True)
+            made_dirs.add(parent)
+        _place_file(src_path, dest_path, link_mode)
+        copied += 1
+        print(f"Copied: {src_path} -> {dest_path}")
+
+    live = set(current)
+    removed = 0
+    for rel_path in sorted(set(previous) - live):
+        dest_path = os.path.join(dest, rel_path)
+        if os.path.exists(dest_path):
+            # Also prunes directories left empty, e.g. images/ once static/images is gone
+            remove_output(dest_path, dest)
+            removed += 1
+            print(f"Removed stale asset: {dest_path}")
+    print(f"Synced static assets: {copied} copied, {removed} removed, {len(current) - copied} unchanged")
+    return sorted(current)
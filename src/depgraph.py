@@ -0,0 +1,48 @@
+import os
+
+
+class DependencyGraph:
+    """
+    Records, for every page source, the output it was built into, the files the
+    output was built from (with their hashes at build time) and the site URLs
+    the page links to. Stored in the build manifest under "pages".
+    """
+
+    def __init__(self, pages=None):
+        self.pages = pages if pages is not None else {}
+
+    def record(self, page, output, inputs, hash_of, references=()):
+        self.pages[page] = {
+            "output": output,
+            "inputs": {path: hash_of(path) for path in inputs},
+            "references": sorted(set(references)),
+        }
+
+    def is_stale(self, page, output, required):
+        """
+        A page is stale if it was never built, moved, lost its output or now needs
+        an input it wasn't built from (e.g. a new layout). Pages built from inputs
+        that changed since are found with dependents(changed_inputs(hash_of)).
+        """
+        entry = self.pages.get(page)
+        if entry is None or entry.get("output") != output or not os.path.exists(output):
+            return True
+        inputs = entry.get("inputs", {})
+        return any(path not in inputs for path in required)
+
+    def changed_inputs(self, hash_of):
+        """
+        Returns the set of recorded inputs whose content differs from what
+        some page was built from, hashing each distinct input once.
+        """
+        recorded = set()
+        for entry in self.pages.values():
+            recorded.update(entry.get("inputs", {}).items())
+        return {path for path, digest in recorded if hash_of(path) != digest}
+
+    def dependents(self, paths):
+        """
+        Returns the sorted pages whose output was built from any of paths.
+        """
+        paths = set(paths)
+        return sorted(page for page, entry in self.pages.items() if paths.intersection(entry.get("inputs", {})))
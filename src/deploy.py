@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+
+from manifest import hash_file
+
+OUTPUT_MANIFEST_NAME = "output-manifest.json"
+OUTPUT_MANIFEST_VERSION = 1
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+# A fixed table rather than mimetypes, which also reads the host's mime.types:
+# the same file must get the same type on every machine that builds the site
+CONTENT_TYPES = {
+    ".html": "text/html", ".htm": "text/html", ".xml": "application/xml", ".txt": "text/plain",
+    ".css": "text/css", ".js": "text/javascript", ".mjs": "text/javascript",
+    ".json": "application/json", ".map": "application/json", ".webmanifest": "application/manifest+json",
+    ".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".gif": "image/gif",
+    ".svg": "image/svg+xml", ".webp": "image/webp", ".avif": "image/avif", ".ico": "image/vnd.microsoft.icon",
+    ".woff": "font/woff", ".woff2": "font/woff2", ".ttf": "font/ttf", ".otf": "font/otf",
+    ".eot": "application/vnd.ms-fontobject", ".wasm": "application/wasm",
+    ".mp4": "video/mp4", ".webm": "video/webm", ".mp3": "audio/mpeg", ".ogg": "audio/ogg",
+    ".pdf": "application/pdf", ".zip": "application/zip",
+}
+CONTENT_ENCODINGS = {".gz": "gzip", ".br": "br", ".zst": "zstd", ".bz2": "bzip2", ".xz": "xz"}
+
+
+def content_type(rel_path: str):
+    """
+    Returns (content type, content encoding) for an output path:
+    index.html -> ("text/html", None), index.html.gz -> ("text/html", "gzip").
+    """
+    root, ext = os.path.splitext(rel_path)
+    encoding = CONTENT_ENCODINGS.get(ext.lower())
+    if encoding is not None:
+        ext = os.path.splitext(root)[1]
+    return CONTENT_TYPES.get(ext.lower(), DEFAULT_CONTENT_TYPE), encoding
+
+
+def scan_outputs(output_dir, rel_paths, known=None, previous=None, hash_of=hash_file):
+    """
+    Describes every file in rel_paths (relative to output_dir) for the output
+    manifest. Hashes come from known ({rel_path: hash}, e.g. pages just
+    written) or from previous, the stat cache returned by the last scan, when
+    the file's size and mtime are what they were; other files are hashed.
+    Returns ({rel_path: entry}, stat cache).
+    """
+    known = known or {}
+    previous = previous or {}
+    files = {}
+    stats = {}
+    for rel_path in rel_paths:
+        stat = os.stat(os.path.join(output_dir, rel_path))
+        digest = known.get(rel_path)
+        if digest is None:
+            cached = previous.get(rel_path)
+            if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+                digest = cached[2]
+            else:
+                digest = hash_of(os.path.join(output_dir, rel_path))
+        stats[rel_path] = [stat.st_size, stat.st_mtime_ns, digest]
+        mime_type, encoding = content_type(rel_path)
+        entry = {"size": stat.st_size, "hash": digest, "type": mime_type}
+        if encoding:
+            entry["encoding"] = encoding
+        files[rel_path.replace(os.sep, "/")] = entry
+    return files, stats
+
+
+def write_output_manifest(path, files):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": OUTPUT_MANIFEST_VERSION, "files": files}, f, indent=2, sort_keys=True)
+
+
+def load_output_manifest(path):
+    """
+    Returns the files of an output manifest; a missing one is empty, so
+    diffing against it lists every file as added.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if manifest.get("version") != OUTPUT_MANIFEST_VERSION:
+        raise ValueError(f"{path}: unsupported output manifest version {manifest.get('version')!r}")
+    return manifest["files"]
+
+
+def diff_manifests(old, new):
+    """
+    Compares two output manifests' files, returning the sorted paths that are
+    "added", "changed" (different content or type) and "removed".
+    """
+    return {
+        "added": sorted(path for path in new if path not in old),
+        "changed": sorted(path for path in new if path in old and old[path] != new[path]),
+        "removed": sorted(path for path in old if path not in new),
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py diff", description="List the files that differ between two output manifests."
+    )
+    parser.add_argument("old", help="output manifest of the deployed site (may be missing)")
+    parser.add_argument("new", help="output manifest of the new build")
+    parser.add_argument("--json", action="store_true", help="print the differences as JSON")
+    args = parser.parse_args(argv)
+
+    diff = diff_manifests(load_output_manifest(args.old), load_output_manifest(args.new))
+    if args.json:
+        print(json.dumps(diff, indent=2))
+        return
+    for status, key in (("A", "added"), ("M", "changed"), ("D", "removed")):
+        for path in diff[key]:
+            print(f"{status}\t{path}")
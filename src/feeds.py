@@ -0,0 +1,134 @@
+import os
+import re
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape, quoteattr
+
+from outputs import OutputFile
+from urls import page_url
+
+SITEMAP_NAME = "sitemap.xml"
+# The sitemaps.org limit per file; bigger sites get a sitemap index
+SITEMAP_MAX_URLS = 50000
+SITEMAP_PART = re.compile(r"sitemap-\d+\.xml")
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+FEED_NAME = "atom.xml"
+FEED_ENTRIES = 20
+ATOM_NS = "http://www.w3.org/2005/Atom"
+
+
+def iso_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class XmlWriter:
+    """
+    Writes an XML document to out element by element, so nothing is kept in
+    memory but the stack of open tags.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.open = []
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+
+    def _tag(self, tag, attrs):
+        return tag + "".join(f" {name}={quoteattr(value)}" for name, value in (attrs or {}).items())
+
+    def start(self, tag, attrs=None):
+        self.out.write(f"<{self._tag(tag, attrs)}>")
+        self.open.append(tag)
+
+    def end(self):
+        self.out.write(f"</{self.open.pop()}>")
+
+    def element(self, tag, text=None, attrs=None):
+        if text is None:
+            self.out.write(f"<{self._tag(tag, attrs)}/>")
+        else:
+            self.out.write(f"<{self._tag(tag, attrs)}>{escape(text)}</{tag}>")
+
+    def close(self):
+        while self.open:
+            self.end()
+        self.out.write("\n")
+
+
+def _write_urlset(path, base_url, pages):
+    with OutputFile(path) as f:
+        xml = XmlWriter(f)
+        xml.start("urlset", {"xmlns": SITEMAP_NS})
+        for rel_path, updated in pages:
+            xml.start("url")
+            xml.element("loc", base_url + page_url(rel_path))
+            xml.element("lastmod", iso_time(updated))
+            xml.end()
+        xml.close()
+    return f.changed
+
+
+def write_sitemap(output_dir, base_url, pages):
+    """
+    Writes output_dir/sitemap.xml listing pages, a list of (rel_path, updated)
+    with rel_path relative to output_dir and updated a timestamp, under
+    base_url (the site's absolute URL, ending in /). Past SITEMAP_MAX_URLS
+    pages, the URLs go to sitemap-1.xml, sitemap-2.xml, ... and sitemap.xml
+    is the sitemap index listing them. Returns the number of files written.
+    """
+    pages = sorted(pages)
+    parts = [pages[start:start + SITEMAP_MAX_URLS] for start in range(0, len(pages), SITEMAP_MAX_URLS)]
+    written = 0
+    part_names = []
+    if len(parts) <= 1:
+        written += _write_urlset(os.path.join(output_dir, SITEMAP_NAME), base_url, pages)
+    else:
+        for number, part in enumerate(parts, 1):
+            part_names.append((f"sitemap-{number}.xml", max(updated for _, updated in part)))
+            written += _write_urlset(os.path.join(output_dir, part_names[-1][0]), base_url, part)
+        with OutputFile(os.path.join(output_dir, SITEMAP_NAME)) as f:
+            xml = XmlWriter(f)
+            xml.start("sitemapindex", {"xmlns": SITEMAP_NS})
+            for name, updated in part_names:
+                xml.start("sitemap")
+                xml.element("loc", base_url + name)
+                xml.element("lastmod", iso_time(updated))
+                xml.end()
+            xml.close()
+        written += f.changed
+
+    live = {name for name, _ in part_names}
+    for name in os.listdir(output_dir):
+        if SITEMAP_PART.fullmatch(name) and name not in live:
+            os.remove(os.path.join(output_dir, name))
+    print(f"Sitemap: {len(pages)} URLs in {max(1, len(parts))} file(s)")
+    return written
+
+
+def write_feed(path, feed_url, site_url, title, author, entries):
+    """
+    Writes an Atom feed to path (served at feed_url) from entries, a list of
+    (url, title, updated) with absolute urls, keeping the FEED_ENTRIES most
+    recently updated. The feed's own updated time is the newest entry's, so
+    an unchanged section produces an identical file. Returns whether path was written.
+    """
+    entries = sorted(entries, key=lambda entry: (-entry[2], entry[0]))[:FEED_ENTRIES]
+    with OutputFile(path) as f:
+        xml = XmlWriter(f)
+        xml.start("feed", {"xmlns": ATOM_NS})
+        xml.element("id", feed_url)
+        xml.element("title", title)
+        xml.element("link", attrs={"rel": "self", "href": feed_url})
+        xml.element("link", attrs={"href": site_url})
+        xml.element("updated", iso_time(max((updated for _, _, updated in entries), default=0)))
+        xml.start("author")
+        xml.element("name", author)
+        xml.end()
+        for url, entry_title, updated in entries:
+            xml.start("entry")
+            xml.element("id", url)
+            xml.element("title", entry_title)
+            xml.element("link", attrs={"href": url})
+            xml.element("updated", iso_time(updated))
+            xml.end()
+        xml.close()
+    print(f"Feed: {len(entries)} entries in {path}")
+    return f.changed
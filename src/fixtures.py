@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+
+class TempDirTestCase(unittest.TestCase):
+    """
+    A test case with a fresh temporary directory, self.root, for every test.
+    Subclasses overriding setUp or tearDown call the base ones first.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, rel_path):
+        return os.path.join(self.root, rel_path)
+
+    def write(self, rel_path, text):
+        """
+        Writes text to rel_path below the root, creating directories as
+        needed, and returns the file's path.
+        """
+        path = self.path(rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def read(self, rel_path):
+        with open(self.path(rel_path), "r", encoding="utf-8") as f:
+            return f.read()
@@ -1,9 +1,13 @@
+import sys
 from typing import List
 
 
 class HtmlNode:
+    # Slotted to keep whole-site trees small: no per-instance __dict__
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag: str = None, value: str = None, children: list = None, props: dict = None):
-        self.tag = tag
+        self.tag = sys.intern(tag) if tag is not None else None
         self.value = value
         self.children = children
         self.props = props
@@ -11,6 +15,22 @@ class HtmlNode:
     def to_html(self):
         raise NotImplementedError()
 
+    def iter_html(self):
+        """
+        Yields the node's HTML as a sequence of chunks.
+        Subclasses that only implement to_html yield it as a single chunk.
+        """
+        yield self.to_html()
+
+    def render_to(self, out):
+        """
+        Streams the node's HTML into out (anything with a write method,
+        e.g. an io.StringIO or an open file) without building the full string.
+        """
+        write = out.write
+        for chunk in self.iter_html():
+            write(chunk)
+
     def props_to_html(self):
         props_html = ""
         if self.props:
@@ -26,6 +46,8 @@ class HtmlNode:
 
 
 class ParentNode(HtmlNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, children: List[HtmlNode], value: str = None, props: dict = None):
         if tag is None:
             raise ValueError("Tag cannot be None")
@@ -34,11 +56,37 @@ class ParentNode(HtmlNode):
         super().__init__(tag, value, children, props)
 
     def to_html(self):
-        value_html = self.value if self.value is not None else ""
-        return f"<{self.tag}{self.props_to_html()}>{value_html}{''.join([child.to_html() for child in self.children])}</{self.tag}>"
+        parts = []
+        self._write_html(parts.append)
+        return "".join(parts)
+
+    def render_to(self, out):
+        self._write_html(out.write)
+
+    def _write_html(self, write):
+        # Walk the tree with an explicit stack so deep trees neither recurse
+        # nor copy each subtree's HTML once per level; leaves are written
+        # straight out rather than through a generator each
+        stack = [self]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            node = pop()
+            if type(node) is str:
+                write(node)
+            elif isinstance(node, ParentNode):
+                props_html = node.props_to_html() if node.props else ""
+                value_html = node.value if node.value is not None else ""
+                write(f"<{node.tag}{props_html}>{value_html}")
+                push(f"</{node.tag}>")
+                stack.extend(reversed(node.children))
+            else:
+                write(node.to_html())
 
 
 class LeafNode(HtmlNode):
+    __slots__ = ()
+
     SELF_CLOSING_TAGS = {"img", "br", "hr", "input", "meta", "link", "area", "base", "col", "embed", "source", "track", "wbr"}
 
     def __init__(self, tag: str, value: str, props: dict = None):
@@ -46,7 +94,14 @@ class LeafNode(HtmlNode):
             value = None
         elif value is None:
             raise ValueError("Value cannot be None")
-        super().__init__(tag, value, [], props)
+        # Leaves never have children, so don't store a list per leaf
+        self.tag = sys.intern(tag) if tag is not None else None
+        self.value = value
+        self.props = props
+
+    @property
+    def children(self):
+        return []
 
     def to_html(self):
         if self.tag is None:
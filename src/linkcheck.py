@@ -0,0 +1,93 @@
+import os
+import posixpath
+import re
+from urllib.parse import unquote
+
+from urls import is_root_relative, page_url, split_path
+
+# The target of an inline link or image, as textnode's LINK_PATTERN and IMAGE_PATTERN read it
+LINK_TARGET = re.compile(r"\]\(([^\(\)]*)\)")
+
+
+class BrokenLinksError(Exception):
+    pass
+
+
+def output_index(rel_paths):
+    """
+    Returns the set of site paths that resolve to one of rel_paths (output
+    files relative to the output root): each file's own path, plus
+    blog/tom for blog/tom/index.html ("" for the root) and about for
+    about.html, the way static hosts serve them.
+    """
+    index = set()
+    for rel_path in rel_paths:
+        path = rel_path.replace(os.sep, "/")
+        index.add(path)
+        if path == "index.html" or path.endswith("/index.html"):
+            index.add(path[: -len("/index.html")] if "/" in path else "")
+        elif path.endswith(".html"):
+            index.add(path[: -len(".html")])
+    return index
+
+
+def target_path(url, page_rel_path):
+    """
+    Returns the site path an internal URL on the page at page_rel_path (its
+    output path) points to, without query or fragment, or None for a link to
+    the page itself (#top, ?q=1).
+    """
+    if is_root_relative(url):
+        path = split_path(url)[0]
+    else:
+        path = split_path("/" + url)[0]
+        if not path:
+            return None
+        base = page_url(page_rel_path)
+        path = posixpath.join(base if base.endswith("/") or not base else posixpath.dirname(base), path)
+    path = posixpath.normpath(unquote(path))
+    return "" if path == "." else path
+
+
+def find_lines(md_path, urls):
+    """
+    Returns {url: [line numbers]} for the lines of md_path with a link or
+    image to one of urls, reading the file once. URLs that aren't found
+    (e.g. split across lines) map to [None].
+    """
+    found = {url: [] for url in urls}
+    with open(md_path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            for url in LINK_TARGET.findall(line):
+                if url in found and (not found[url] or found[url][-1] != number):
+                    found[url].append(number)
+    return {url: lines or [None] for url, lines in found.items()}
+
+
+def check_references(pages, output_dir, index):
+    """
+    Checks the internal links ("references" and "relative_links") and images
+    ("images") recorded for every page in pages ({md_path: manifest entry})
+    against index (see output_index). Returns the sorted dangling references
+    as (md_path, line, kind, url), reading sources only to locate those.
+    """
+    problems = []
+    for md_path, entry in pages.items():
+        page_rel_path = os.path.relpath(entry["output"], output_dir)
+        urls = [("link", url) for url in entry["references"] + entry["relative_links"]]
+        urls += [("image", url) for url in entry["images"]]
+        broken = []
+        for kind, url in urls:
+            path = target_path(url, page_rel_path)
+            if path is not None and path not in index:
+                broken.append((kind, url))
+        if broken:
+            lines = find_lines(md_path, [url for _, url in broken])
+            problems.extend((md_path, line, kind, url) for kind, url in broken for line in lines[url])
+    return sorted(problems, key=lambda problem: (problem[0], problem[1] or 0, problem[3]))
+
+
+def report(problems):
+    for md_path, line, kind, url in problems:
+        print(f"{md_path}:{line if line is not None else '?'}: broken {kind} {url}")
+    print(f"Checked links: {len(problems)} broken")
@@ -1,36 +1,223 @@
-from copyutil import copy_static_to_public
-from utils import generate_page
-import shutil
+from build import build_site, normalize_basepath
+from linkcheck import BrokenLinksError
+from buildtrace import BuildTrace
+from deploy import OUTPUT_MANIFEST_NAME
+from minify import CssMinifier
+from parsecache import CACHE_DIR, ParseCache
+from precompress import CODECS
+from pngopt import PngOptimizer
+from shards import ShardMergeError, parse_shard
+from utils import PageGenerationError
+import argparse
 import os
 import sys
 
-def main():
-    # Get basepath from CLI, default to "/"
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
-    if not basepath.startswith("/"):
-        basepath = "/" + basepath
-    if not basepath.endswith("/"):
-        basepath += "/"
-
-    output_dir = "docs"
-    if os.path.exists(output_dir):
-        shutil.rmtree(output_dir)
-    copy_static_to_public(dest=output_dir)
-
-    # Walk through all markdown files in content/
-    for root, dirs, files in os.walk("content"):
-        for file in files:
-            if file.endswith(".md"):
-                md_path = os.path.join(root, file)
-                rel_path = os.path.relpath(md_path, "content")  # ex: blog/foo.md
-                html_path = os.path.splitext(rel_path)[0] + ".html"
-                dest_path = os.path.join(output_dir, html_path)
-                generate_page(
-                    from_path=md_path,
-                    template_path="template.html",
-                    dest_path=dest_path,
-                    basepath=basepath,
-                )
+
+def shard_arg(spec):
+    try:
+        return parse_shard(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generate the static site from content/ into docs/ (or --output-dir).")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served under")
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default="docs",
+        help="directory to write the site into (default: docs), e.g. one per --shard",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only regenerate pages whose inputs changed since the last build",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes for page generation (0 = one per CPU core)",
+    )
+    parser.add_argument(
+        "--link-assets",
+        choices=["copy", "hardlink", "reflink"],
+        default="copy",
+        help="how incremental builds place static files in the output",
+    )
+    parser.add_argument(
+        "--hash-assets",
+        action="store_true",
+        help="compare static files by content hash instead of size and mtime",
+    )
+    parser.add_argument(
+        "--site-url",
+        help="absolute site URL (e.g. https://example.com) to prefix root-relative links with",
+    )
+    parser.add_argument(
+        "--relative-urls",
+        action="store_true",
+        help="write links relative to each page so the output works from any location",
+    )
+    parser.add_argument(
+        "--fingerprint-assets",
+        action="store_true",
+        help="publish static files as name.<hash>.ext and point pages at those names",
+    )
+    parser.add_argument(
+        "--optimize-images",
+        action="store_true",
+        help="losslessly recompress PNGs (cached per image) and give images width and height",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="minify generated pages and stylesheets",
+    )
+    parser.add_argument(
+        "--precompress",
+        nargs="?",
+        const="gz",
+        metavar="CODECS",
+        help=f"write compressed siblings of HTML/CSS/JS outputs; comma-separated codecs from {sorted(CODECS)} (default: gz)",
+    )
+    parser.add_argument(
+        "--output-manifest",
+        nargs="?",
+        const=True,
+        metavar="PATH",
+        help=f"list every output file with its size, hash and content type in PATH (default: OUTPUT_DIR/{OUTPUT_MANIFEST_NAME}); "
+        "compare two with 'main.py diff OLD NEW'",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="write a full-text search index of the pages to OUTPUT_DIR/search/",
+    )
+    parser.add_argument(
+        "--sitemap",
+        action="store_true",
+        help="write sitemap.xml (split with a sitemap index past 50,000 pages); needs --site-url",
+    )
+    parser.add_argument(
+        "--feed",
+        metavar="SECTION",
+        help="write an Atom feed of the pages under content/SECTION to OUTPUT_DIR/SECTION/atom.xml; needs --site-url",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="report internal links and images that point at no output file",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="check links and images and fail the build if any is broken",
+    )
+    parser.add_argument(
+        "--shard",
+        type=shard_arg,
+        metavar="I/N",
+        help="build only the I-th of N slices of the pages (no static files or other site-wide outputs)",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        metavar="SHARD_DIR",
+        help="instead of generating pages, merge the output directories of every --shard into OUTPUT_DIR "
+        "and build the site-wide outputs",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=CACHE_DIR,
+        help="where parsed documents are cached between builds",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="parse every document instead of using the parse cache",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print per-stage timings and the slowest pages after the build",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="OUT_JSON",
+        help="write per-page and per-stage timings as a Chrome trace to OUT_JSON",
+    )
+    args = parser.parse_args(argv)
+    if args.shard and args.merge:
+        parser.error("--shard and --merge can't be combined")
+    if args.merge and os.path.abspath(args.output_dir) in {os.path.abspath(shard_dir) for shard_dir in args.merge}:
+        parser.error("--merge reads the shards' output directories; write the merged site to another --output-dir")
+    if args.output_manifest is True:
+        args.output_manifest = os.path.join(args.output_dir, OUTPUT_MANIFEST_NAME)
+    if (args.sitemap or args.feed) and not args.site_url:
+        parser.error("--sitemap and --feed need --site-url")
+    if args.precompress:
+        unknown = [codec for codec in args.precompress.split(",") if codec not in CODECS]
+        if unknown:
+            parser.error(f"unknown --precompress codec {', '.join(unknown)}; choose from {', '.join(sorted(CODECS))}")
+    return args
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "serve":
+        import server
+
+        server.main(argv[1:])
+        return
+    if argv and argv[0] == "diff":
+        import deploy
+
+        deploy.main(argv[1:])
+        return
+
+    args = parse_args(argv)
+    basepath = normalize_basepath(args.basepath)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    tracer = BuildTrace() if args.profile or args.trace else None
+    try:
+        build_site(
+            basepath=basepath,
+            output_dir=args.output_dir,
+            incremental=args.incremental,
+            jobs=jobs,
+            link_assets=args.link_assets,
+            hash_assets=args.hash_assets,
+            site_url=args.site_url,
+            relative_urls=args.relative_urls,
+            parse_cache=None if args.no_cache else ParseCache(args.cache_dir),
+            fingerprint_assets=args.fingerprint_assets,
+            image_optimizer=PngOptimizer(args.cache_dir) if args.optimize_images else None,
+            css_minifier=CssMinifier(args.cache_dir) if args.minify else None,
+            minify_html=args.minify,
+            precompress=tuple(args.precompress.split(",")) if args.precompress else (),
+            output_manifest=args.output_manifest,
+            search=args.search,
+            sitemap=args.sitemap,
+            feed_section=args.feed,
+            check_links=args.check_links,
+            strict_links=args.strict,
+            shard=args.shard,
+            merge_shards_from=args.merge or (),
+            tracer=tracer,
+        )
+    except (PageGenerationError, ShardMergeError, BrokenLinksError) as e:
+        print(f"Build failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.trace:
+        tracer.write(args.trace)
+        print(f"Wrote build trace to {args.trace}")
+    if args.profile:
+        print(tracer.summary())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+
+from depgraph import DependencyGraph
+
+GENERATOR_VERSION = "5"
+MANIFEST_NAME = ".ssg-manifest.json"
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: str) -> str:
+    """
+    Returns the sha256 hex digest of the file at path, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(path: str) -> dict:
+    """
+    Loads a build manifest, returning an empty one if it is missing or unreadable.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"settings": {}, "pages": {}}
+    manifest.setdefault("settings", {})
+    manifest.setdefault("pages", {})
+    return manifest
+
+
+def save_manifest(path: str, manifest: dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def build_settings(
+    basepath: str,
+    site_url: str = None,
+    relative_urls: bool = False,
+    assets: str = None,
+    minify_html: bool = False,
+    search: bool = False,
+) -> dict:
+    """
+    Inputs shared by every page: if any of these change, every page is stale.
+    Per-page inputs such as templates are tracked in the dependency graph.
+    assets is the digest of the fingerprinted asset names, if any.
+    """
+    return {
+        "basepath": basepath,
+        "site_url": site_url,
+        "relative_urls": relative_urls,
+        "assets": assets,
+        "minify_html": minify_html,
+        "search": search,
+        "version": GENERATOR_VERSION,
+    }
+
+
+class HashCache:
+    """
+    Hashes each file at most once per build. Missing files hash to None.
+    """
+
+    def __init__(self):
+        self.hashes = {}
+
+    def __call__(self, path):
+        if path not in self.hashes:
+            self.hashes[path] = hash_file(path) if os.path.isfile(path) else None
+        return self.hashes[path]
+
+
+def plan_incremental_build(pages, previous: dict, settings: dict, inputs_for=None, hash_of=None, rebuild_all=False):
+    """
+    Compares the current pages against the previous manifest.
+    pages is a list of (md_path, dest_path) tuples and inputs_for(md_path) lists
+    the files a page is known to need up front (its source and template).
+    With rebuild_all, every page is rebuilt, as if the settings had changed.
+    Returns (to_build, to_delete, manifest) where to_build is the subset of pages
+    whose inputs changed, to_delete lists outputs whose sources disappeared and
+    manifest is the manifest describing the tree once the build has finished.
+    Entries for rebuilt pages can be refined with record_page afterwards.
+    """
+    inputs_for = inputs_for or (lambda md_path: [md_path])
+    hash_of = hash_of or HashCache()
+    graph = DependencyGraph(previous.get("pages", {}))
+    settings_changed = rebuild_all or previous.get("settings") != settings
+
+    changed = set() if settings_changed else set(graph.dependents(graph.changed_inputs(hash_of)))
+    to_build = []
+    current = DependencyGraph()
+    for md_path, dest_path in pages:
+        required = inputs_for(md_path)
+        if settings_changed or md_path in changed or graph.is_stale(md_path, dest_path, required):
+            to_build.append((md_path, dest_path))
+            current.record(md_path, dest_path, required, hash_of)
+        else:
+            current.pages[md_path] = graph.pages[md_path]
+
+    live_outputs = {entry["output"] for entry in current.pages.values()}
+    to_delete = sorted(
+        entry["output"]
+        for md_path, entry in graph.pages.items()
+        if md_path not in current.pages and entry.get("output") not in live_outputs
+    )
+    return to_build, to_delete, {"settings": settings, "pages": current.pages}
+
+
+def record_page(manifest: dict, md_path: str, dest_path: str, record: dict, hash_of):
+    """
+    Stores what generate_page reported for a page (the files it read and the
+    pages it links to) in the manifest's dependency graph.
+    """
+    DependencyGraph(manifest["pages"]).record(
+        md_path, dest_path, record["inputs"], hash_of, record.get("references", ())
+    )
+
+
+def remove_output(dest_path: str, output_dir: str):
+    """
+    Deletes a stale output file and prunes any directories it leaves empty,
+    never climbing above output_dir.
+    """
+    if os.path.exists(dest_path):
+        os.remove(dest_path)
+    parent = os.path.dirname(dest_path)
+    root = os.path.abspath(output_dir)
+    while parent and os.path.abspath(parent) != root:
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
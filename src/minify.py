@@ -0,0 +1,199 @@
+import re
+
+from assetcache import AssetTransform
+
+# Bump whenever the minifiers' output changes, so cached results are redone
+MINIFIER_VERSION = "1"
+# Contents of these elements are written exactly as they are
+PRESERVE_TAGS = {"pre", "code", "textarea", "script", "style"}
+# Close tags of those, matched case-insensitively in the original text
+# (str.lower() can change its length, so indexes into a lowered copy don't line up)
+PRESERVE_CLOSE = {name: re.compile("</" + name, re.I) for name in PRESERVE_TAGS}
+# Whitespace next to these tags is never rendered, so it is dropped entirely
+BLOCK_TAGS = {
+    "!doctype", "address", "article", "aside", "blockquote", "body", "br", "dd", "details",
+    "dialog", "div", "dl", "dt", "fieldset", "figcaption", "figure", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "head", "header", "hgroup", "hr", "html", "li",
+    "link", "main", "meta", "nav", "noscript", "ol", "option", "p", "pre", "section",
+    "summary", "table", "tbody", "td", "tfoot", "th", "thead", "title", "tr", "ul",
+}
+WHITESPACE = re.compile(r"\s+")
+SPACE_IN_TAG = re.compile(r"\s\s|[\t\n\r\f]|\s/?>$")
+# A comment, a tag (a > inside a quoted attribute value doesn't end it),
+# a run of text, or a lone < (a stray one, or a tag that isn't complete yet)
+HTML_TOKEN = re.compile(r"""<!--.*?-->|<[a-zA-Z/!](?:[^>"']|"[^"]*"|'[^']*')*>|[^<]+|<""", re.S)
+
+TAG_NAME = re.compile(r"</?([!a-zA-Z][-a-zA-Z0-9]*)")
+# Writes are gathered up to this many characters before being minified in one go
+BATCH_CHARS = 1 << 14
+
+
+def _minify_tag(tag):
+    """
+    Collapses whitespace inside a tag, outside attribute values:
+    <meta  charset="utf-8" /> -> <meta charset="utf-8"/>
+    """
+    if not SPACE_IN_TAG.search(tag):
+        return tag
+    parts = []
+    quote = None
+    space = False
+    for char in tag:
+        if quote:
+            parts.append(char)
+            if char == quote:
+                quote = None
+        elif char.isspace():
+            space = True
+        else:
+            if space and char not in "/>":
+                parts.append(" ")
+            space = False
+            parts.append(char)
+            if char in "\"'":
+                quote = char
+    return "".join(parts)
+
+
+class HtmlMinifier:
+    """
+    A writer that minifies HTML on its way to out: whitespace runs collapse to
+    one space, whitespace next to block-level tags and comments are dropped,
+    and whitespace inside tags is tidied. Contents of <pre>, <code>,
+    <textarea>, <script> and <style> pass through untouched. Works on
+    arbitrary chunks, holding back at most BATCH_CHARS of input and an
+    incomplete tag; call close() after the last write (out is not closed).
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.buffer = ""
+        self.chunks = []
+        self.size = 0
+        self.preserve = None
+        self.pending_space = False
+        self.after_block = True
+
+    def write(self, chunk):
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+        if self.size >= BATCH_CHARS:
+            self._flush_chunks()
+
+    def _flush_chunks(self):
+        self.buffer += "".join(self.chunks)
+        self.chunks.clear()
+        self.size = 0
+        self._process()
+
+    def close(self):
+        self._flush_chunks()
+        if self.buffer:
+            # An unterminated tag or comment at the end is written as it is
+            self.out.write(self.buffer)
+            self.buffer = ""
+
+    def _process(self):
+        text = self.buffer
+        pos = 0
+        while pos < len(text):
+            if self.preserve is not None:
+                match = PRESERVE_CLOSE[self.preserve].search(text, pos)
+                if match is None:
+                    # Keep back enough to recognize a close tag split across writes
+                    keep = max(pos, len(text) - len(self.preserve) - 1)
+                    self.out.write(text[pos:keep])
+                    pos = keep
+                    break
+                self.out.write(text[pos:match.start()])
+                self.preserve = None
+                pos = match.start()
+                continue
+
+            token = HTML_TOKEN.match(text, pos).group()
+            first = token[0]
+            if first != "<":
+                self._text(token)
+            elif token == "<":
+                if pos + 1 == len(text) or text[pos + 1].isalpha() or text[pos + 1] in "/!":
+                    # The start of a tag or comment whose end hasn't been written yet
+                    break
+                # A stray < in text
+                self._text(token)
+            elif token.startswith("<!--"):
+                if token.startswith("<!--[if"):
+                    self._tag(token, None)
+            else:
+                match = TAG_NAME.match(token)
+                name = match.group(1).lower() if match else None
+                self._tag(_minify_tag(token), name)
+                if name in PRESERVE_TAGS and token[1] != "/" and not token.endswith("/>"):
+                    self.preserve = name
+            pos += len(token)
+        self.buffer = text[pos:]
+
+    def _text(self, text):
+        collapsed = WHITESPACE.sub(" ", text)
+        if collapsed.startswith(" "):
+            self.pending_space = True
+            collapsed = collapsed[1:]
+        if not collapsed:
+            return
+        trailing = collapsed.endswith(" ")
+        if trailing:
+            collapsed = collapsed[:-1]
+        if self.pending_space and not self.after_block:
+            self.out.write(" ")
+        self.out.write(collapsed)
+        self.pending_space = trailing
+        self.after_block = False
+
+    def _tag(self, tag, name):
+        block = name in BLOCK_TAGS
+        if self.pending_space and not self.after_block and not block:
+            self.out.write(" ")
+        self.pending_space = False
+        self.out.write(tag)
+        self.after_block = block
+
+
+CSS_TOKEN = re.compile(r"""/\*.*?\*/|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|\s+|[{};,>]|[^\s"'/{};,>]+|/""", re.S)
+CSS_TIGHT = set("{};,>")
+
+
+def minify_css(css: str) -> str:
+    """
+    Drops comments (except /*! ... */ notices), insignificant whitespace
+    (around braces, semicolons, commas and child combinators, and after
+    colons) and the last semicolon in each block. Strings are kept as they are.
+    """
+    parts = []
+    space = False
+    for match in CSS_TOKEN.finditer(css):
+        token = match.group()
+        if token.startswith("/*") and not token.startswith("/*!"):
+            continue
+        if token.isspace():
+            space = True
+            continue
+        if token == "}" and parts and parts[-1] == ";":
+            parts.pop()
+        if space and parts and token not in CSS_TIGHT and parts[-1] not in CSS_TIGHT and not parts[-1].endswith(":"):
+            parts.append(" ")
+        space = False
+        parts.append(token)
+    return "".join(parts)
+
+
+class CssMinifier(AssetTransform):
+    """
+    Publishes minify_css'd copies of stylesheets, each minified once per distinct content.
+    """
+
+    extensions = (".css",)
+    name = "minified"
+    version = MINIFIER_VERSION
+    errors = (UnicodeDecodeError,)
+
+    def transform(self, data: bytes) -> bytes:
+        return minify_css(data.decode("utf-8")).encode("utf-8")
@@ -0,0 +1,111 @@
+import hashlib
+import io
+import os
+
+from manifest import hash_file
+
+
+def ensure_dirs(paths):
+    """
+    Creates the parent directories of every path in paths, each distinct
+    directory once, parents before children.
+    """
+    dirs = {os.path.dirname(path) for path in paths}
+    for directory in sorted(dirs):
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+
+
+def _create_temp(directory):
+    """
+    Creates a new temporary file in directory and returns (fd, path). Unlike
+    mkstemp's private files, it gets the mode a plain open() would give it
+    (0666 less the umask), so it can be published as it is.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    while True:
+        path = os.path.join(directory, f".{os.urandom(8).hex()}.tmp")
+        try:
+            return os.open(path, flags, 0o666), path
+        except FileExistsError:
+            continue
+
+
+class _HashingFileIO(io.FileIO):
+    """
+    A raw file that hashes what is written to it, seeing the buffered blocks
+    rather than every small write.
+    """
+
+    def __init__(self, fd):
+        super().__init__(fd, "wb")
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        written = super().write(data)
+        self.digest.update(memoryview(data)[:written])
+        self.size += written
+        return written
+
+
+class OutputFile:
+    """
+    A text file written atomically, and only if its content changed: writes
+    go to a temporary file next to dest_path, hashed as they are written, and
+    on close the temporary file replaces dest_path unless dest_path already
+    holds the same bytes, in which case it is left untouched (mtime included).
+    Use as a context manager; if the block raises, dest_path is not touched.
+    After closing, changed tells whether dest_path was written and hash is
+    the sha256 hex digest of its content.
+    """
+
+    def __init__(self, dest_path, encoding="utf-8"):
+        self.dest_path = dest_path
+        self.encoding = encoding
+        self.changed = None
+        self.hash = None
+        directory = os.path.dirname(dest_path) or "."
+        try:
+            fd, self.tmp_path = _create_temp(directory)
+        except FileNotFoundError:
+            # Callers writing many files create directories up front (ensure_dirs)
+            os.makedirs(directory, exist_ok=True)
+            fd, self.tmp_path = _create_temp(directory)
+        self.raw = _HashingFileIO(fd)
+        self.file = io.TextIOWrapper(io.BufferedWriter(self.raw), encoding=encoding)
+
+    def write(self, chunk):
+        return self.file.write(chunk)
+
+    def _same_as_dest(self):
+        try:
+            size = os.path.getsize(self.dest_path)
+        except OSError:
+            return False
+        return size == self.raw.size and hash_file(self.dest_path) == self.hash
+
+    def close(self):
+        self.file.close()
+        self.hash = self.raw.digest.hexdigest()
+        if self._same_as_dest():
+            os.remove(self.tmp_path)
+            self.changed = False
+        else:
+            os.replace(self.tmp_path, self.dest_path)
+            self.changed = True
+        return self.changed
+
+    def discard(self):
+        self.file.close()
+        os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+        return False
@@ -0,0 +1,285 @@
+import marshal
+import os
+import struct
+import tempfile
+
+from htmlnode import LeafNode, ParentNode
+from manifest import hash_file
+from textnode import MarkdownDocument, TextNode, TextType, write_document
+from urls import resolve_url
+
+# Bump whenever the parser's output changes, so stale entries are never replayed
+PARSER_VERSION = "1"
+CACHE_DIR = ".ssg-cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+URL_ATTRIBUTES = {"a": "href", "img": "src"}
+# Top-level nodes are stored in length-prefixed batches: marshal.load on a file
+# reads byte by byte, while loads on one batch is fast and memory stays bounded
+BATCH_NODES = 256
+FRAME_HEADER = struct.Struct("<I")
+
+
+class ParseCacheError(Exception):
+    pass
+
+
+def encode_node(node):
+    """
+    Returns node as nested tuples marshal can store: (tag, value, props) for
+    leaves and (tag, value, props, [children]) for parents.
+    """
+    if isinstance(node, ParentNode):
+        return (node.tag, node.value, node.props, [encode_node(child) for child in node.children])
+    return (node.tag, node.value, node.props)
+
+
+def _resolve_props(tag, props, url_prefix, assets):
+    attribute = URL_ATTRIBUTES[tag]
+    url = props[attribute]
+    props = dict(props, **{attribute: resolve_url(url, url_prefix, assets)})
+    size = assets.size_for(url) if assets and tag == "img" else None
+    if size:
+        props["width"], props["height"] = str(size[0]), str(size[1])
+    return props
+
+
+def render_encoded(data, url_prefix="/", assets=None):
+    """
+    Returns the HTML of an encoded node, exactly as the decoded node's to_html
+    would, without building the nodes.
+    """
+    parts = []
+    stack = [data]
+    while stack:
+        data = stack.pop()
+        if isinstance(data, str):
+            parts.append(data)
+            continue
+        tag, value, props = data[0], data[1], data[2]
+        if tag is None:
+            parts.append(value)
+            continue
+        if props:
+            if (url_prefix != "/" or assets) and tag in URL_ATTRIBUTES:
+                props = _resolve_props(tag, props, url_prefix, assets)
+            props_html = "".join(f' {key}="{prop}"' for key, prop in props.items())
+        else:
+            props_html = ""
+        if len(data) == 4:
+            parts.append(f"<{tag}{props_html}>{value if value is not None else ''}")
+            stack.append(f"</{tag}>")
+            stack.extend(reversed(data[3]))
+        elif tag in LeafNode.SELF_CLOSING_TAGS:
+            parts.append(f"<{tag}{props_html}/>")
+        else:
+            parts.append(f"<{tag}{props_html}>{value}</{tag}>")
+    return "".join(parts)
+
+
+def resolve_node_urls(node, url_prefix, assets=None):
+    """
+    Resolves link and image URLs in a freshly parsed tree in place.
+    """
+    if url_prefix == "/" and not assets:
+        return
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ParentNode):
+            stack.extend(node.children)
+        elif node.tag in URL_ATTRIBUTES and node.props:
+            node.props = _resolve_props(node.tag, node.props, url_prefix, assets)
+
+
+class ParseCache:
+    """
+    Parsed documents on disk, keyed by source hash and parser version, so an
+    unchanged document is rendered without being parsed again.
+
+    An entry is a stream of batches of encoded top-level nodes followed by a
+    trailer with the document's link and image TextNodes; it is written and
+    replayed a batch at a time and rendered without rebuilding HtmlNodes.
+    URLs are stored unresolved, so one entry serves every basepath and asset set. Hits bump
+    the entry's mtime and prune() evicts the least recently used entries once
+    the cache grows past max_bytes.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.dir = os.path.join(root, "parse")
+
+    def key_for(self, md_path):
+        return f"{hash_file(md_path)}.v{PARSER_VERSION}"
+
+    def path_for(self, key):
+        return os.path.join(self.dir, key)
+
+    def document(self, md_path, lines, on_textnodes=None, trace=None, url_prefix="/", assets=None, all_textnodes=False):
+        """
+        Returns a document for md_path (whose lines are given) that renders
+        like MarkdownDocument: replayed from the cache on a hit, parsed and
+        stored on a miss. A hit only replays link and image TextNodes to
+        on_textnodes; with all_textnodes set, the document is parsed again
+        (and its entry rewritten) so on_textnodes sees every TextNode.
+        """
+        path = self.path_for(self.key_for(md_path))
+        if all_textnodes:
+            return _RecordingDocument(path, lines, on_textnodes, trace, url_prefix, assets)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return _RecordingDocument(path, lines, on_textnodes, trace, url_prefix, assets)
+        return _CachedDocument(path, on_textnodes, trace, url_prefix, assets)
+
+    def discard(self, md_path):
+        try:
+            os.remove(self.path_for(self.key_for(md_path)))
+        except FileNotFoundError:
+            pass
+
+    def prune(self):
+        """
+        Removes entries from other parser versions, leftover temporary files
+        and, oldest first, entries beyond max_bytes. Returns the number removed.
+        Must not run while pages are being generated.
+        """
+        try:
+            names = os.listdir(self.dir)
+        except FileNotFoundError:
+            return 0
+        removed = 0
+        entries = []
+        for name in names:
+            path = os.path.join(self.dir, name)
+            if not name.endswith(f".v{PARSER_VERSION}"):
+                os.remove(path)
+                removed += 1
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+
+def _write_frame(f, obj):
+    data = marshal.dumps(obj)
+    f.write(FRAME_HEADER.pack(len(data)))
+    f.write(data)
+
+
+def _read_frame(f):
+    header = f.read(FRAME_HEADER.size)
+    if len(header) != FRAME_HEADER.size:
+        raise EOFError("missing frame")
+    size, = FRAME_HEADER.unpack(header)
+    data = f.read(size)
+    if len(data) != size:
+        raise EOFError("short frame")
+    return marshal.loads(data)
+
+
+class _RecordingDocument:
+    def __init__(self, path, lines, on_textnodes, trace, url_prefix, assets):
+        self.path = path
+        self.lines = lines
+        self.on_textnodes = on_textnodes
+        self.trace = trace
+        self.url_prefix = url_prefix
+        self.assets = assets
+
+    def render_to(self, out):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        links = []
+        batch = []
+
+        def collect(textnodes):
+            for node in textnodes:
+                if node.text_type in (TextType.LINK, TextType.IMAGE):
+                    links.append((node.text, node.text_type.value, node.link))
+            if self.on_textnodes is not None:
+                self.on_textnodes(textnodes)
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                def store(node):
+                    batch.append(encode_node(node))
+                    if len(batch) >= BATCH_NODES:
+                        _write_frame(f, batch)
+                        batch.clear()
+                    resolve_node_urls(node, self.url_prefix, self.assets)
+
+                document = MarkdownDocument(self.lines, on_textnodes=collect, trace=self.trace, on_block=store)
+                document.render_to(out)
+                if batch:
+                    _write_frame(f, batch)
+                _write_frame(f, {"links": links})
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+class _EncodedNode:
+    __slots__ = ("tag", "data", "url_prefix", "assets")
+
+    def __init__(self, data, url_prefix, assets):
+        self.tag = data[0]
+        self.data = data
+        self.url_prefix = url_prefix
+        self.assets = assets
+
+    def render_to(self, out):
+        try:
+            html = render_encoded(self.data, self.url_prefix, self.assets)
+        except (TypeError, ValueError, KeyError, IndexError, AttributeError) as e:
+            raise ParseCacheError(f"malformed node in cache entry: {type(e).__name__}: {e}") from e
+        out.write(html)
+
+
+class _CachedDocument:
+    def __init__(self, path, on_textnodes, trace, url_prefix, assets):
+        self.path = path
+        self.on_textnodes = on_textnodes
+        self.trace = trace
+        self.url_prefix = url_prefix
+        self.assets = assets
+
+    def _iter_nodes(self, f):
+        while True:
+            try:
+                frame = _read_frame(f)
+            except (EOFError, ValueError, TypeError) as e:
+                raise ParseCacheError(f"{self.path}: truncated or corrupt entry") from e
+            if isinstance(frame, dict):
+                break
+            if not isinstance(frame, list):
+                raise ParseCacheError(f"{self.path}: corrupt entry, expected a batch of nodes")
+            for data in frame:
+                if not isinstance(data, tuple) or len(data) not in (3, 4):
+                    raise ParseCacheError(f"{self.path}: corrupt entry, malformed node")
+                yield _EncodedNode(data, self.url_prefix, self.assets)
+        try:
+            links = [TextNode(text, TextType(text_type), url) for text, text_type, url in frame["links"]]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ParseCacheError(f"{self.path}: corrupt entry, malformed links") from e
+        if self.on_textnodes is not None and links:
+            self.on_textnodes(links)
+
+    def render_to(self, out):
+        with open(self.path, "rb") as f:
+            nodes = self._iter_nodes(f)
+            render = None
+            if self.trace is not None:
+                nodes = self.trace.timed_iter("read", nodes)
+                out = self.trace.timed_writer(out)
+                render = self.trace.timed("render", lambda node: node.render_to(out))
+            write_document(nodes, out, render)
@@ -0,0 +1,96 @@
+import struct
+import zlib
+
+from assetcache import AssetTransform
+
+# Bump whenever optimize_png's output changes, so cached results are redone
+OPTIMIZER_VERSION = "1"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Critical chunks, and the ancillary ones that change how pixels are displayed;
+# everything else (text, timestamps, pHYs, EXIF, ...) is dropped
+KEEP_CHUNKS = {b"IHDR", b"PLTE", b"tRNS", b"gAMA", b"cHRM", b"sRGB", b"iCCP", b"sBIT", b"IEND"}
+ANIMATION_CHUNKS = {b"acTL", b"fcTL", b"fdAT"}
+STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)
+
+
+def iter_chunks(data: bytes):
+    """
+    Yields (type, body) for every chunk of a PNG, checking each chunk's CRC.
+    Raises ValueError for a chunk cut short by the end of the data.
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("Not a PNG file")
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        if pos + 12 > len(data):
+            raise ValueError("Truncated PNG chunk")
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        if pos + 12 + length > len(data):
+            raise ValueError(f"Truncated PNG chunk {chunk_type!r}")
+        body = data[pos + 8:pos + 8 + length]
+        crc, = struct.unpack(">I", data[pos + 8 + length:pos + 12 + length])
+        if zlib.crc32(chunk_type + body) != crc:
+            raise ValueError(f"Corrupt PNG chunk {chunk_type!r}")
+        yield chunk_type, body
+        pos += 12 + length
+
+
+def make_chunk(chunk_type: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + chunk_type + body + struct.pack(">I", zlib.crc32(chunk_type + body))
+
+
+def _deflate(raw: bytes, strategy: int) -> bytes:
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(raw) + compressor.flush()
+
+
+def optimize_png(data: bytes) -> bytes:
+    """
+    Losslessly shrinks a PNG: drops ancillary chunks that don't affect display
+    and re-deflates the image data at maximum compression, keeping the smaller
+    of the strategies tried. The decoded pixels are unchanged. Animated PNGs,
+    and PNGs that don't get smaller, are returned as they are.
+    """
+    chunks = list(iter_chunks(data))
+    if not chunks or chunks[-1][0] != b"IEND":
+        raise ValueError("Truncated PNG, no IEND chunk")
+    if any(chunk_type in ANIMATION_CHUNKS for chunk_type, _ in chunks):
+        return data
+    raw = zlib.decompress(b"".join(body for chunk_type, body in chunks if chunk_type == b"IDAT"))
+    image_data = min((_deflate(raw, strategy) for strategy in STRATEGIES), key=len)
+
+    parts = [PNG_SIGNATURE]
+    for chunk_type, body in chunks:
+        if chunk_type == b"IDAT":
+            if image_data is not None:
+                parts.append(make_chunk(b"IDAT", image_data))
+                image_data = None
+        elif chunk_type in KEEP_CHUNKS:
+            parts.append(make_chunk(chunk_type, body))
+    optimized = b"".join(parts)
+    return optimized if len(optimized) < len(data) else data
+
+
+def image_size(path: str):
+    """
+    Returns (width, height) of the PNG at path from its header, or None if it isn't one.
+    """
+    with open(path, "rb") as f:
+        header = f.read(24)
+    if len(header) < 24 or not header.startswith(PNG_SIGNATURE) or header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+class PngOptimizer(AssetTransform):
+    """
+    Publishes optimize_png'd copies of PNGs, each optimized once per distinct content.
+    """
+
+    extensions = (".png",)
+    name = "optimized"
+    version = OPTIMIZER_VERSION
+    errors = (ValueError, zlib.error)
+
+    def transform(self, data: bytes) -> bytes:
+        return optimize_png(data)
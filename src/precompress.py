@@ -0,0 +1,92 @@
+import gzip
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest import hash_file
+
+COMPRESSIBLE_EXTENSIONS = {".html", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt"}
+DEFAULT_CODECS = ("gz",)
+
+# suffix -> function compressing bytes; register_codec adds more (e.g. brotli)
+CODECS = {
+    # mtime=0 keeps the output byte-identical between builds
+    "gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0),
+    "zz": lambda data: zlib.compress(data, 9),
+}
+
+
+def register_codec(suffix, compress):
+    """
+    Makes a codec available to precompress_outputs: compress(bytes) -> bytes,
+    written next to each file as <file>.<suffix>.
+    """
+    CODECS[suffix] = compress
+
+
+def _compress_file(path, codecs):
+    with open(path, "rb") as f:
+        data = f.read()
+    for suffix in codecs:
+        compressed = CODECS[suffix](data)
+        sibling = f"{path}.{suffix}"
+        if len(compressed) < len(data):
+            with open(sibling, "wb") as f:
+                f.write(compressed)
+        elif os.path.exists(sibling):
+            # Not worth serving; don't leave a stale one behind either
+            os.remove(sibling)
+
+
+def _remove_siblings(path, codecs):
+    for suffix in codecs:
+        sibling = f"{path}.{suffix}"
+        if os.path.exists(sibling):
+            os.remove(sibling)
+
+
+def precompress_outputs(output_dir, rel_paths, previous=None, codecs=DEFAULT_CODECS, jobs=1, hash_of=hash_file):
+    """
+    Writes a compressed sibling (index.html.gz, ...) for every compressible
+    file in rel_paths, skipping files whose hash is the one recorded in
+    previous, the state returned by the last call. Siblings of files that are
+    gone are removed. Compression runs on jobs threads (zlib releases the GIL).
+    Returns the state to pass as previous next time, or None when codecs is
+    empty and every sibling written before has been removed.
+    """
+    unknown = [suffix for suffix in codecs if suffix not in CODECS]
+    if unknown:
+        raise ValueError(f"Unknown compression codec: {', '.join(unknown)}")
+    previous = previous or {}
+    if not codecs:
+        for rel_path in previous.get("files", {}):
+            _remove_siblings(os.path.join(output_dir, rel_path), previous["codecs"])
+        return None
+    # Siblings written before are still good if no codec was added
+    previous_files = previous.get("files", {}) if set(codecs) <= set(previous.get("codecs", ())) else {}
+
+    files = {}
+    todo = []
+    for rel_path in rel_paths:
+        if os.path.splitext(rel_path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            continue
+        path = os.path.join(output_dir, rel_path)
+        files[rel_path] = hash_of(path)
+        if previous_files.get(rel_path) != files[rel_path]:
+            todo.append(path)
+
+    dropped_codecs = [suffix for suffix in previous.get("codecs", ()) if suffix not in codecs]
+    for rel_path in previous.get("files", {}):
+        if rel_path not in files:
+            _remove_siblings(os.path.join(output_dir, rel_path), previous["codecs"])
+        elif dropped_codecs:
+            _remove_siblings(os.path.join(output_dir, rel_path), dropped_codecs)
+
+    if jobs > 1 and len(todo) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(lambda path: _compress_file(path, codecs), todo))
+    else:
+        for path in todo:
+            _compress_file(path, codecs)
+    print(f"Precompressed ({', '.join(codecs)}): {len(todo)} compressed, {len(files) - len(todo)} unchanged")
+    return {"codecs": list(codecs), "files": files}
@@ -0,0 +1,173 @@
+import json
+import os
+import re
+from collections import Counter
+
+from outputs import OutputFile
+from urls import page_url
+
+SEARCH_DIR = "search"
+SEARCH_INDEX_NAME = "index.json"
+SEARCH_PAGES_NAME = "pages.json"
+# Bump whenever tokenizing, stemming or the file format changes
+SEARCH_VERSION = 1
+PREFIX_LENGTH = 2
+MIN_TERM_LENGTH = 2
+WORD = re.compile(r"\w+")
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i in is it its of on or she that the their them "
+    "they this to was were which will with you your".split()
+)
+# Longest first; a suffix is only removed if at least MIN_STEM characters remain
+SUFFIXES = ("ingly", "edly", "ing", "ies", "ied", "ed", "es", "ly", "s")
+MIN_STEM = 3
+SHARD_NAME = re.compile(r"[a-z0-9]+")
+
+
+def stem(word: str) -> str:
+    """
+    A deliberately light stemmer: strips one common English suffix, so
+    "hobbits"/"hobbit" and "walking"/"walked"/"walk" meet, and otherwise leaves
+    words alone. Search clients must stem queries the same way.
+    """
+    if word.endswith("ss"):
+        return word
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            if suffix in ("ies", "ied"):
+                return word[:-3] + "y"
+            return word[: -len(suffix)]
+    return word
+
+
+def tokenize(text: str):
+    """
+    Yields the index terms of text: lowercased words, minus stop words and
+    words shorter than MIN_TERM_LENGTH, stemmed.
+    """
+    for word in WORD.findall(text.lower()):
+        if len(word) >= MIN_TERM_LENGTH and word not in STOP_WORDS:
+            yield stem(word)
+
+
+class TermCollector:
+    """
+    An on_textnodes callback counting the terms in the text of every TextNode
+    it is given (link text and image alt text included).
+    """
+
+    def __init__(self):
+        # Raw words are counted as they come; each distinct word is filtered
+        # and stemmed once, in terms()
+        self.words = Counter()
+
+    def __call__(self, textnodes):
+        self.words.update(WORD.findall(" ".join(node.text for node in textnodes if node.text).lower()))
+
+    def terms(self) -> dict:
+        counts = Counter()
+        for word, count in self.words.items():
+            if len(word) >= MIN_TERM_LENGTH and word not in STOP_WORDS:
+                counts[stem(word)] += count
+        return dict(counts)
+
+
+def shard_file(prefix: str) -> str:
+    # Prefixes that aren't plain ASCII get a name every filesystem and URL accepts
+    if SHARD_NAME.fullmatch(prefix):
+        return f"{prefix}.json"
+    return "x" + prefix.encode("utf-8").hex() + ".json"
+
+
+def assign_ids(md_paths, previous_ids):
+    """
+    Gives every page a document id, keeping the ids of pages that were already
+    indexed so unchanged shards stay valid. Ids freed by removed pages are
+    reused, lowest first. Returns {md_path: id}.
+    """
+    ids = {md_path: previous_ids[md_path] for md_path in md_paths if md_path in previous_ids}
+    taken = set(ids.values())
+    free = (doc_id for doc_id in range(len(md_paths) + len(taken) + 1) if doc_id not in taken)
+    for md_path in sorted(md_paths):
+        if md_path not in ids:
+            ids[md_path] = next(free)
+    return ids
+
+
+def encode_postings(postings):
+    """
+    Flattens {doc_id: count} into [gap, count, gap, count, ...] with doc ids in
+    ascending order, each stored as the gap from the previous one.
+    """
+    encoded = []
+    last = 0
+    for doc_id in sorted(postings):
+        encoded.extend((doc_id - last, postings[doc_id]))
+        last = doc_id
+    return encoded
+
+
+def decode_postings(encoded):
+    postings = {}
+    doc_id = 0
+    for i in range(0, len(encoded), 2):
+        doc_id += encoded[i]
+        postings[doc_id] = encoded[i + 1]
+    return postings
+
+
+def _write_json(path, data):
+    with OutputFile(path) as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    return f.changed
+
+
+def write_search_index(output_dir, pages, previous_ids=None):
+    """
+    Writes the search index for pages, {md_path: (rel_path, title, {term: count})},
+    into output_dir/search:
+        index.json  {"version", "prefix_length", "pages": "pages.json", "shards": {prefix: file}}
+        pages.json  [[url, title], ...] indexed by document id (null for unused ids)
+        <shard>.json  {term: postings} for the terms starting with one prefix,
+                      postings as written by encode_postings
+    so a client loads index.json, then only the shards for its query's prefixes.
+    Files whose content didn't change are left untouched and shards that are no
+    longer needed are removed. Returns the {md_path: id} to pass as
+    previous_ids next time.
+    """
+    ids = assign_ids(list(pages), previous_ids or {})
+    titles = [None] * (max(ids.values()) + 1 if ids else 0)
+    shards = {}
+    for md_path, (rel_path, title, terms) in pages.items():
+        doc_id = ids[md_path]
+        titles[doc_id] = [page_url(rel_path), title]
+        for term, count in terms.items():
+            shards.setdefault(term[:PREFIX_LENGTH], {}).setdefault(term, {})[doc_id] = count
+
+    search_dir = os.path.join(output_dir, SEARCH_DIR)
+    os.makedirs(search_dir, exist_ok=True)
+    files = {prefix: shard_file(prefix) for prefix in shards}
+    written = 0
+    for prefix, terms in shards.items():
+        encoded = {term: encode_postings(postings) for term, postings in terms.items()}
+        written += _write_json(os.path.join(search_dir, files[prefix]), encoded)
+    written += _write_json(os.path.join(search_dir, SEARCH_PAGES_NAME), titles)
+    written += _write_json(
+        os.path.join(search_dir, SEARCH_INDEX_NAME),
+        {
+            "version": SEARCH_VERSION,
+            "prefix_length": PREFIX_LENGTH,
+            "pages": SEARCH_PAGES_NAME,
+            "shards": files,
+        },
+    )
+
+    live = set(files.values()) | {SEARCH_PAGES_NAME, SEARCH_INDEX_NAME}
+    removed = 0
+    for name in os.listdir(search_dir):
+        # Compressed siblings (search/index.json.gz) are precompress's to clean up
+        if name.endswith(".json") and name not in live:
+            os.remove(os.path.join(search_dir, name))
+            removed += 1
+    print(f"Search index: {len(pages)} pages, {len(files)} shards ({written} files written, {removed} removed)")
+    return ids
@@ -0,0 +1,258 @@
+import argparse
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from build import build_site, discover_pages, page_output_path
+from copyutil import list_files, sync_static
+from depgraph import DependencyGraph
+from manifest import MANIFEST_NAME, HashCache, load_manifest, remove_output
+from template import resolve_template
+from utils import generate_page
+
+RELOAD_PATH = "/__livereload"
+RELOAD_SCRIPT = (
+    "<script>new EventSource(\"" + RELOAD_PATH + "\")"
+    ".onmessage = function () { location.reload(); };</script>"
+)
+
+
+def snapshot(paths):
+    """
+    Returns {file_path: (mtime_ns, size)} for every file under the given
+    files and directories. Missing paths are skipped.
+    """
+    state = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for root, dirs, files in os.walk(path):
+            for name in files:
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                state[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+def diff_snapshots(before, after):
+    """
+    Returns the set of paths that were added, changed or removed.
+    """
+    changed = {path for path, state in after.items() if before.get(path) != state}
+    changed.update(path for path in before if path not in after)
+    return changed
+
+
+class DevBuilder:
+    """
+    Keeps a built site up to date in a warm process, redoing only the pages and
+    assets affected by a set of changed source paths. Pages affected by a
+    template are found in the dependency graph of the build manifest, which
+    is kept current as pages are redone.
+    """
+
+    def __init__(self, output_dir="docs", content_dir="content", static_dir="static",
+                 template_path="template.html", layouts_dir="layouts"):
+        self.output_dir = output_dir
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.layouts_dir = layouts_dir
+        self.assets = []
+        self.layouts = set()
+        self.graph = DependencyGraph()
+
+    @property
+    def watched_paths(self):
+        return [self.content_dir, self.static_dir, self.template_path, self.layouts_dir]
+
+    def build_all(self):
+        build_site(
+            output_dir=self.output_dir,
+            content_dir=self.content_dir,
+            static_dir=self.static_dir,
+            template_path=self.template_path,
+            layouts_dir=self.layouts_dir,
+        )
+        self.assets = list_files(self.static_dir)
+        self.layouts = set(snapshot([self.template_path, self.layouts_dir]))
+        self.graph = DependencyGraph(load_manifest(os.path.join(self.output_dir, MANIFEST_NAME))["pages"])
+
+    def template_for(self, md_path):
+        return resolve_template(os.path.relpath(md_path, self.content_dir), self.template_path, self.layouts_dir)
+
+    def _is_under(self, path, directory):
+        return os.path.abspath(path).startswith(os.path.abspath(directory) + os.sep)
+
+    def rebuild(self, changed):
+        """
+        Applies a set of changed paths and returns how many outputs were redone.
+        """
+        pages = set()
+        templates = set()
+        static_changed = False
+        for path in changed:
+            if self._is_under(path, self.content_dir) and path.endswith(".md"):
+                pages.add(path)
+            elif self._is_under(path, self.static_dir):
+                static_changed = True
+            elif path == self.template_path or self._is_under(path, self.layouts_dir):
+                templates.add(path)
+
+        if templates:
+            layouts = set(snapshot([self.template_path, self.layouts_dir]))
+            if layouts != self.layouts:
+                # Adding or deleting a layout changes which pages use it, so redo them all
+                pages.update(md_path for md_path, _ in discover_pages(self.content_dir, self.output_dir))
+            else:
+                pages.update(self.graph.dependents(templates))
+            self.layouts = layouts
+
+        redone = 0
+        if static_changed:
+            self.assets = sync_static(self.static_dir, self.output_dir, previous=self.assets)
+            redone += 1
+        hash_of = HashCache()
+        for md_path in sorted(pages):
+            dest_path = page_output_path(md_path, self.content_dir, self.output_dir)
+            if not os.path.exists(md_path):
+                remove_output(dest_path, self.output_dir)
+                self.graph.pages.pop(md_path, None)
+            else:
+                record = generate_page(md_path, self.template_for(md_path), dest_path)
+                self.graph.record(md_path, dest_path, record["inputs"], hash_of, record["references"])
+            redone += 1
+        return redone
+
+
+class LiveReload:
+    """
+    Counts builds and lets request threads wait for the next one.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the output directory, injecting the live reload script into HTML
+    pages and streaming reload events on RELOAD_PATH.
+    """
+
+    live_reload = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == RELOAD_PATH:
+            return self.stream_reloads()
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.split("?")[0].endswith("/"):
+            path = os.path.join(path, "index.html")
+        if self.live_reload is None or not path.endswith(".html") or not os.path.isfile(path):
+            return super().do_GET()
+
+        with open(path, "rb") as f:
+            html = f.read().decode("utf-8")
+        if "</body>" in html:
+            html = html.replace("</body>", RELOAD_SCRIPT + "</body>", 1)
+        else:
+            html += RELOAD_SCRIPT
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_reloads(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        generation = self.live_reload.generation
+        try:
+            while True:
+                current = self.live_reload.wait(generation, timeout=15)
+                if current != generation:
+                    generation = current
+                    self.wfile.write(b"data: reload\n\n")
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def watch(builder, live_reload, interval=0.05, stop=None):
+    """
+    Polls the builder's sources every interval seconds, rebuilding what changed
+    and notifying open browsers. Runs until stop (a threading.Event) is set.
+    """
+    state = snapshot(builder.watched_paths)
+    while stop is None or not stop.is_set():
+        time.sleep(interval)
+        current = snapshot(builder.watched_paths)
+        changed = diff_snapshots(state, current)
+        state = current
+        if not changed:
+            continue
+        started = time.perf_counter()
+        try:
+            builder.rebuild(changed)
+        except Exception as e:
+            print(f"Rebuild failed: {type(e).__name__}: {e}")
+            continue
+        print(f"Rebuilt {len(changed)} changed file(s) in {(time.perf_counter() - started) * 1000:.1f} ms")
+        live_reload.notify()
+
+
+def serve(output_dir="docs", port=8888, watch_sources=False, interval=0.05):
+    builder = DevBuilder(output_dir=output_dir)
+    builder.build_all()
+
+    live_reload = LiveReload() if watch_sources else None
+    handler = type("Handler", (DevRequestHandler,), {"live_reload": live_reload})
+    server = ThreadingHTTPServer(("", port), partial(handler, directory=output_dir))
+    server.daemon_threads = True
+
+    if watch_sources:
+        thread = threading.Thread(target=watch, args=(builder, live_reload, interval), daemon=True)
+        thread.start()
+    print(f"Serving {output_dir} on http://localhost:{port}/" + (" (watching for changes)" if watch_sources else ""))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Build the site and serve it locally.")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--watch", action="store_true", help="rebuild on changes and live-reload open pages")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between source polls")
+    args = parser.parse_args(argv)
+    serve(port=args.port, watch_sources=args.watch, interval=args.interval)
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import shutil
+
+from manifest import MANIFEST_NAME, load_manifest, remove_output
+
+
+class ShardMergeError(Exception):
+    pass
+
+
+def parse_shard(spec: str):
+    """
+    Parses "i/N" (1 <= i <= N) into (i, N).
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard {spec!r}, expected i/N such as 2/4") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {spec!r}, i must be between 1 and N")
+    return index, count
+
+
+def shard_of(rel_path: str, count: int) -> int:
+    """
+    Returns the shard (1 to count) a page belongs to, from a hash of its path
+    relative to the content directory, so every machine agrees on it.
+    """
+    key = rel_path.replace(os.sep, "/").encode("utf-8")
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "big") % count + 1
+
+
+def select_shard(pages, content_dir, shard):
+    """
+    Returns the (md_path, dest_path) pages that belong to shard, an (i, N) pair.
+    """
+    index, count = shard
+    return [page for page in pages if shard_of(os.path.relpath(page[0], content_dir), count) == index]
+
+
+def _is_copied(src_path, dest_path):
+    try:
+        src_stat, dest_stat = os.stat(src_path), os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    return src_stat.st_size == dest_stat.st_size and src_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+
+def plan_merge(shard_dirs, output_dir, settings, pages):
+    """
+    Checks that the shard directories are exactly the shards 1 to N of one
+    build, built with settings, that together cover pages (the (md_path,
+    dest_path) pages of the site) with no page built by two shards.
+    Raises ShardMergeError if not; nothing is written either way. Returns
+    (merged, copies): the merged manifest entries ({md_path: entry}) with
+    outputs under output_dir, and the (src_path, dest_path) files to copy.
+    Each shard's pages are located through its manifest, so shard directories
+    may be moved after being built.
+    """
+    manifests = []
+    for shard_dir in shard_dirs:
+        manifest = load_manifest(os.path.join(shard_dir, MANIFEST_NAME))
+        if "shard" not in manifest:
+            raise ShardMergeError(f"{shard_dir} is not the output of a sharded build")
+        if manifest["settings"] != settings:
+            raise ShardMergeError(f"{shard_dir} was built with different settings: {manifest['settings']}")
+        manifests.append((shard_dir, manifest))
+
+    counts = {manifest["shard"][1] for _, manifest in manifests}
+    indexes = sorted(manifest["shard"][0] for _, manifest in manifests)
+    if len(counts) != 1 or indexes != list(range(1, counts.pop() + 1)):
+        shards = ", ".join(f"{manifest['shard'][0]}/{manifest['shard'][1]}" for _, manifest in manifests)
+        raise ShardMergeError(f"Expected shards 1/N to N/N of one build, got {shards}")
+
+    merged = {}
+    owners = {}
+    collisions = []
+    copies = []
+    for shard_dir, manifest in manifests:
+        # Outputs are recorded under the directory the shard was built into;
+        # only the pages it lists are copied, whatever else the directory holds
+        built_into = manifest.get("output_dir", shard_dir)
+        for md_path, entry in manifest["pages"].items():
+            if md_path in owners:
+                collisions.append(f"{md_path} ({owners[md_path]}, {shard_dir})")
+                continue
+            owners[md_path] = shard_dir
+            rel_path = os.path.relpath(entry["output"], built_into)
+            src_path = os.path.join(shard_dir, rel_path)
+            if not os.path.isfile(src_path):
+                raise ShardMergeError(f"{shard_dir} lacks {rel_path}, the output of {md_path}")
+            copies.append((src_path, os.path.join(output_dir, rel_path)))
+            merged[md_path] = dict(entry, output=copies[-1][1])
+    if collisions:
+        raise ShardMergeError("Pages built by more than one shard: " + "; ".join(collisions))
+
+    expected = dict(pages)
+    missing = sorted(md_path for md_path in expected if md_path not in merged)
+    unexpected = sorted(md_path for md_path in merged if expected.get(md_path) != merged[md_path]["output"])
+    if missing or unexpected:
+        raise ShardMergeError(
+            f"Shards don't match the content: missing {missing or 'nothing'}, stale {unexpected or 'nothing'}"
+        )
+    return merged, copies
+
+
+def apply_merge(output_dir, merged, copies, previous_pages=None):
+    """
+    Copies the files of a merge planned by plan_merge into output_dir, skipping
+    those already there with the same size and mtime, and removes the pages
+    listed in previous_pages (the last merge's) that are gone.
+    """
+    made_dirs = set()
+    copied = 0
+    for src_path, dest_path in copies:
+        if _is_copied(src_path, dest_path):
+            continue
+        parent = os.path.dirname(dest_path)
+        if parent not in made_dirs:
+            os.makedirs(parent, exist_ok=True)
+            made_dirs.add(parent)
+        shutil.copy2(src_path, dest_path)
+        copied += 1
+
+    live_outputs = {entry["output"] for entry in merged.values()}
+    for md_path, entry in (previous_pages or {}).items():
+        if md_path not in merged and entry.get("output") not in live_outputs:
+            print(f"Removing stale page {entry['output']}")
+            remove_output(entry["output"], output_dir)
+    print(f"Merged {len(merged)} pages: {copied} files copied, {len(copies) - copied} unchanged")
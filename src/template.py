@@ -0,0 +1,94 @@
+import os
+import re
+
+from urls import rewrite_root_urls
+
+SLOT_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class Template:
+    """
+    A template parsed once into literal segments and named {{ Slot }} placeholders.
+    Rendering joins the segments in a single pass.
+    """
+
+    def __init__(self, source: str):
+        self.literals = []
+        self.slots = []
+        pos = 0
+        for match in SLOT_PATTERN.finditer(source):
+            self.literals.append(source[pos:match.start()])
+            self.slots.append((match.group(1), match.group(0)))
+            pos = match.end()
+        self.literals.append(source[pos:])
+
+    @property
+    def slot_names(self):
+        return {name for name, _ in self.slots}
+
+    def with_url_prefix(self, url_prefix: str, assets=None) -> "Template":
+        """
+        Returns a copy whose literal segments have root-relative URLs pointed
+        at url_prefix and at fingerprinted assets.
+        """
+        rewritten = Template("")
+        rewritten.literals = [rewrite_root_urls(literal, url_prefix, assets) for literal in self.literals]
+        rewritten.slots = list(self.slots)
+        return rewritten
+
+    def render(self, values: dict) -> str:
+        # Unknown slots are left untouched, as the old str.replace approach did
+        parts = [self.literals[0]]
+        for (name, raw), literal in zip(self.slots, self.literals[1:]):
+            parts.append(values.get(name, raw))
+            parts.append(literal)
+        return "".join(parts)
+
+    def render_to(self, out, values: dict):
+        """
+        Streams the rendered template into out. Slot values may be strings or
+        HtmlNodes, which are rendered straight into the writer.
+        """
+        out.write(self.literals[0])
+        for (name, raw), literal in zip(self.slots, self.literals[1:]):
+            value = values.get(name, raw)
+            if hasattr(value, "render_to"):
+                value.render_to(out)
+            else:
+                out.write(value)
+            out.write(literal)
+
+
+_cache = {}
+
+
+def load_template(path: str, url_prefix: str = "/", assets=None) -> Template:
+    """
+    Returns the compiled template at path, with root-relative URLs pointed at
+    url_prefix and assets, re-reading it only if it changed on disk.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    key = (path, url_prefix, assets)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, "r", encoding="utf-8") as f:
+        template = Template(f.read()).with_url_prefix(url_prefix, assets)
+    _cache[key] = (mtime, template)
+    return template
+
+
+def resolve_template(rel_path: str, default: str = "template.html", layouts_dir: str = "layouts") -> str:
+    """
+    Picks the most specific layout for a page, given its path relative to content/.
+    For blog/tom/index.md this tries layouts/blog/tom.html, then layouts/blog.html,
+    and falls back to the default template.
+    """
+    section = os.path.dirname(rel_path)
+    while section:
+        candidate = os.path.join(layouts_dir, section + ".html")
+        if os.path.isfile(candidate):
+            return candidate
+        section = os.path.dirname(section)
+    return default
+
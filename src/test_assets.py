@@ -0,0 +1,95 @@
+import contextlib
+import io
+import os
+import unittest
+
+from assets import AssetManifest, fingerprint_name
+from build import build_site
+from fixtures import TempDirTestCase
+from manifest import hash_file
+from minify import CssMinifier
+from urls import resolve_url, rewrite_root_urls
+
+
+class TestAssetManifest(TempDirTestCase):
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name("images/a.png", "0123456789abcdef"), "images/a.0123456789.png")
+        self.assertEqual(fingerprint_name("LICENSE", "0123456789abcdef"), "LICENSE.0123456789")
+
+    def test_build_skips_fixed_names(self):
+        self.write("static/index.css", "body {}")
+        self.write("static/robots.txt", "User-agent: *")
+        manifest = AssetManifest.build(os.path.join(self.root, "static"), ["index.css", "robots.txt"])
+        self.assertRegex(manifest.get("index.css"), r"^index\.[0-9a-f]{10}\.css$")
+        self.assertIsNone(manifest.get("robots.txt"))
+        self.assertEqual(manifest.output_name("robots.txt"), "robots.txt")
+
+    def test_manifests_compare_by_content(self):
+        self.assertEqual(AssetManifest({"a.css": "a.1.css"}), AssetManifest({"a.css": "a.1.css"}))
+        self.assertNotEqual(AssetManifest({"a.css": "a.1.css"}), AssetManifest({"a.css": "a.2.css"}))
+        self.assertFalse(AssetManifest())
+
+    def test_resolve_fingerprinted_urls(self):
+        assets = AssetManifest({"index.css": "index.abc.css", "images/a.png": "images/a.def.png"})
+        self.assertEqual(resolve_url("/index.css?v=1#x", "/", assets), "/index.abc.css?v=1#x")
+        self.assertEqual(resolve_url("/images/a.png", "../", assets), "../images/a.def.png")
+        self.assertEqual(resolve_url("/blog/", "/site/", assets), "/site/blog/")
+        self.assertEqual(
+            rewrite_root_urls('<link href="/index.css"/><a href="//cdn/index.css">', "/", assets),
+            '<link href="/index.abc.css"/><a href="//cdn/index.css">',
+        )
+
+    def test_fingerprinted_build(self):
+        self.write("static/index.css", "body {}")
+        self.write("static/images/a.png", "png")
+        self.write("template.html", '<link href="/index.css"/>{{ Content }}')
+        self.write("content/index.md", "# Home\n\n![a](/images/a.png)")
+        options = dict(
+            output_dir=os.path.join(self.root, "docs"),
+            content_dir=os.path.join(self.root, "content"),
+            static_dir=os.path.join(self.root, "static"),
+            template_path=os.path.join(self.root, "template.html"),
+            layouts_dir=os.path.join(self.root, "layouts"),
+            fingerprint_assets=True,
+        )
+        build_site(**options)
+        manifest = AssetManifest.build(options["static_dir"], ["index.css", os.path.join("images", "a.png")])
+        with open(os.path.join(self.root, "docs", "index.html"), "r", encoding="utf-8") as f:
+            html = f.read()
+        self.assertIn(f'href="/{manifest.get("index.css")}"', html)
+        self.assertIn(f'src="/{manifest.get("images/a.png")}"', html)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "docs", "index.css")))
+
+        # Changing an asset publishes it under a new name and drops the old one
+        old_css = os.path.join(self.root, "docs", manifest.get("index.css"))
+        self.write("static/index.css", "body { color: red }")
+        build_site(incremental=True, **options)
+        self.assertFalse(os.path.exists(old_css))
+        with open(os.path.join(self.root, "docs", "index.html"), "r", encoding="utf-8") as f:
+            self.assertNotIn(manifest.get("index.css"), f.read())
+
+    def test_fingerprint_follows_published_content(self):
+        self.write("static/index.css", "body {\n  color: red;\n}\n")
+        self.write("template.html", '<link href="/index.css"/>{{ Content }}')
+        self.write("content/index.md", "# Home")
+        docs = os.path.join(self.root, "docs")
+        options = dict(
+            output_dir=docs,
+            content_dir=os.path.join(self.root, "content"),
+            static_dir=os.path.join(self.root, "static"),
+            template_path=os.path.join(self.root, "template.html"),
+            layouts_dir=os.path.join(self.root, "layouts"),
+            fingerprint_assets=True,
+        )
+        names = []
+        for css_minifier in (None, CssMinifier(os.path.join(self.root, "cache"))):
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_site(css_minifier=css_minifier, **options)
+            (name,) = [name for name in os.listdir(docs) if name.endswith(".css")]
+            self.assertEqual(name, fingerprint_name("index.css", hash_file(os.path.join(docs, name))))
+            names.append(name)
+        self.assertNotEqual(names[0], names[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import time
+import tracemalloc
+import unittest
+
+from buildtrace import BuildTrace, PageTrace, start_page_trace
+
+
+class TestPageTrace(unittest.TestCase):
+    def test_nested_stages_are_exclusive(self):
+        trace = PageTrace("page.md")
+        with trace.stage("template"):
+            time.sleep(0.01)
+            with trace.stage("render"):
+                time.sleep(0.02)
+        self.assertGreaterEqual(trace.stages["render"], 0.02)
+        self.assertGreaterEqual(trace.stages["template"], 0.01)
+        self.assertLess(trace.stages["template"], 0.02)
+
+    def test_timed_iter_and_writer(self):
+        trace = PageTrace("page.md")
+        chunks = []
+
+        class Out:
+            def write(self, chunk):
+                chunks.append(chunk)
+
+        out = trace.timed_writer(Out())
+        for item in trace.timed_iter("parse_blocks", ["a", "b"]):
+            out.write(item)
+        self.assertEqual(chunks, ["a", "b"])
+        self.assertGreater(trace.stages["parse_blocks"], 0)
+        self.assertGreater(trace.stages["write"], 0)
+
+    def test_allocation_tracing_stops_with_the_page(self):
+        trace = start_page_trace("page.md")
+        self.assertTrue(tracemalloc.is_tracing())
+        data = [0] * 1000
+        trace.finish()
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreater(trace.peak_bytes, 0)
+        del data
+
+        # Tracing someone else started is left running
+        tracemalloc.start()
+        try:
+            start_page_trace("page.md").finish()
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+
+
+class TestBuildTrace(unittest.TestCase):
+    def test_report(self):
+        tracer = BuildTrace()
+        with tracer.phase("pages"):
+            for name, seconds in (("fast.md", 0.001), ("slow.md", 0.5)):
+                page = PageTrace(name)
+                page.stages["render"] = seconds
+                page.duration = seconds
+                tracer.add_page(page.to_dict())
+        report = tracer.to_chrome_trace()
+        self.assertEqual([event["name"] for event in report["traceEvents"]], ["pages", "fast.md", "slow.md"])
+        self.assertEqual(report["summary"]["slowest"][0]["page"], "slow.md")
+        self.assertAlmostEqual(report["summary"]["stages"]["render"], 0.501)
+        self.assertIn("slow.md", tracer.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
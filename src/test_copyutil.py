@@ -0,0 +1,59 @@
+import os
+import unittest
+
+from copyutil import list_files, sync_static
+from fixtures import TempDirTestCase
+
+
+class TestSyncStatic(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.write("static/index.css", "body {}")
+        self.write("static/images/a.png", "png-a")
+
+    def test_initial_sync_copies_everything(self):
+        synced = sync_static(self.src, self.dest)
+        self.assertEqual(synced, ["images/a.png", "index.css"])
+        self.assertEqual(list_files(self.dest), synced)
+
+    def test_only_changed_files_are_copied(self):
+        synced = sync_static(self.src, self.dest)
+        untouched = os.stat(os.path.join(self.dest, "images/a.png")).st_mtime_ns
+        self.write("static/index.css", "body { color: red }")
+        sync_static(self.src, self.dest, previous=synced)
+        self.assertEqual(self.read("docs/index.css"), "body { color: red }")
+        self.assertEqual(os.stat(os.path.join(self.dest, "images/a.png")).st_mtime_ns, untouched)
+
+    def test_stale_assets_removed_but_pages_kept(self):
+        synced = sync_static(self.src, self.dest)
+        self.write("docs/index.html", "<html></html>")
+        os.remove(os.path.join(self.src, "images/a.png"))
+        sync_static(self.src, self.dest, previous=synced)
+        self.assertEqual(list_files(self.dest), ["index.css", "index.html"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+
+    def test_hash_compare_detects_same_size_edit(self):
+        synced = sync_static(self.src, self.dest)
+        path = self.write("docs/index.css", "bodx {}")
+        stat = os.stat(os.path.join(self.src, "index.css"))
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        sync_static(self.src, self.dest, previous=synced)
+        self.assertEqual(self.read("docs/index.css"), "bodx {}")
+        sync_static(self.src, self.dest, previous=synced, compare="hash")
+        self.assertEqual(self.read("docs/index.css"), "body {}")
+
+    def test_link_modes(self):
+        for mode in ("hardlink", "reflink"):
+            dest = os.path.join(self.root, mode)
+            sync_static(self.src, dest, link_mode=mode)
+            with open(os.path.join(dest, "images/a.png"), "r", encoding="utf-8") as f:
+                self.assertEqual(f.read(), "png-a")
+        src_stat = os.stat(os.path.join(self.src, "index.css"))
+        link_stat = os.stat(os.path.join(self.root, "hardlink", "index.css"))
+        self.assertEqual(src_stat.st_ino, link_stat.st_ino)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+
+from depgraph import DependencyGraph
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        hashes = {"a.md": "1", "b.md": "2", "template.html": "t", "layouts/blog.html": "l"}
+        self.graph = DependencyGraph()
+        self.graph.record("a.md", "a.html", ["a.md", "template.html"], hashes.get, ["/blog/b"])
+        self.graph.record("b.md", "blog/b.html", ["b.md", "layouts/blog.html"], hashes.get)
+
+    def test_dependents(self):
+        self.assertEqual(self.graph.dependents(["layouts/blog.html"]), ["b.md"])
+        self.assertEqual(self.graph.dependents(["template.html", "b.md"]), ["a.md", "b.md"])
+        self.assertEqual(self.graph.dependents(["other.html"]), [])
+
+    def test_changed_inputs(self):
+        hashes = {"a.md": "1", "b.md": "2b", "template.html": "t", "layouts/blog.html": "l"}
+        self.assertEqual(self.graph.changed_inputs(hashes.get), {"b.md"})
+        hashes["template.html"] = "t2"
+        self.assertEqual(self.graph.dependents(self.graph.changed_inputs(hashes.get)), ["a.md", "b.md"])
+
+    def test_is_stale(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "a.html")
+            self.graph.record("a.md", output, ["a.md", "template.html"], {}.get)
+            self.assertTrue(self.graph.is_stale("a.md", output, ["a.md"]))
+            open(output, "w").close()
+            self.assertFalse(self.graph.is_stale("a.md", output, ["a.md", "template.html"]))
+            self.assertTrue(self.graph.is_stale("a.md", output, ["a.md", "layouts/a.html"]))
+            self.assertTrue(self.graph.is_stale("a.md", os.path.join(tmp, "b.html"), ["a.md"]))
+            self.assertTrue(self.graph.is_stale("new.md", output, ["new.md"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from deploy import content_type, diff_manifests, load_output_manifest, scan_outputs, write_output_manifest
+from fixtures import TempDirTestCase
+from manifest import hash_file
+
+
+class TestContentType(unittest.TestCase):
+    def test_types_and_encodings(self):
+        self.assertEqual(content_type("blog/index.html"), ("text/html", None))
+        self.assertEqual(content_type("index.css.gz"), ("text/css", "gzip"))
+        self.assertEqual(content_type("data.unknownext"), ("application/octet-stream", None))
+        self.assertEqual(content_type("app.JS.br"), ("text/javascript", "br"))
+        self.assertEqual(content_type("archive.gz"), ("application/octet-stream", "gzip"))
+
+
+class TestScanOutputs(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.hashed = []
+
+    def hash_of(self, path):
+        self.hashed.append(os.path.relpath(path, self.root))
+        return hash_file(path)
+
+    def test_known_and_cached_hashes_skip_reading(self):
+        page = self.write("index.html", "<p>hi</p>")
+        self.write("a.css", "a{}")
+        files, stats = scan_outputs(self.root, ["index.html", "a.css"], known={"index.html": "h1"}, hash_of=self.hash_of)
+        self.assertEqual(self.hashed, ["a.css"])
+        self.assertEqual(files["index.html"], {"size": 9, "hash": "h1", "type": "text/html"})
+        self.assertEqual(files["a.css"]["hash"], hash_file(os.path.join(self.root, "a.css")))
+
+        self.hashed.clear()
+        again, _ = scan_outputs(self.root, ["index.html", "a.css"], previous=stats, hash_of=self.hash_of)
+        self.assertEqual(self.hashed, [])
+        self.assertEqual(again, files)
+
+        os.utime(page, ns=(1, 1))
+        scan_outputs(self.root, ["index.html", "a.css"], previous=stats, hash_of=self.hash_of)
+        self.assertEqual(self.hashed, ["index.html"])
+
+
+class TestDiffManifests(unittest.TestCase):
+    def test_added_changed_removed(self):
+        old = {"a.html": {"hash": "1"}, "b.html": {"hash": "2"}, "c.html": {"hash": "3"}}
+        new = {"a.html": {"hash": "1"}, "b.html": {"hash": "9"}, "d.html": {"hash": "4"}}
+        self.assertEqual(
+            diff_manifests(old, new), {"added": ["d.html"], "changed": ["b.html"], "removed": ["c.html"]}
+        )
+
+    def test_round_trip_and_missing(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "out", "manifest.json")
+            files = {"a.html": {"size": 1, "hash": "1", "type": "text/html"}}
+            write_output_manifest(path, files)
+            self.assertEqual(load_output_manifest(path), files)
+            self.assertEqual(load_output_manifest(os.path.join(root, "missing.json")), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
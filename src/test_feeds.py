@@ -0,0 +1,119 @@
+import contextlib
+import io
+import os
+import unittest
+import xml.etree.ElementTree as ET
+
+import feeds
+from build import build_site
+from feeds import XmlWriter, write_feed, write_sitemap
+from fixtures import TempDirTestCase
+
+SITEMAP = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+class TestXmlWriter(unittest.TestCase):
+    def test_escapes_text_and_attributes(self):
+        out = io.StringIO()
+        xml = XmlWriter(out)
+        xml.start("feed", {"xmlns": "urn:x"})
+        xml.element("title", 'Tom & "Goldberry" <3')
+        xml.element("link", attrs={"href": "/a?b=1&c=2"})
+        xml.close()
+        root = ET.fromstring(out.getvalue())
+        self.assertEqual(root.find("{urn:x}title").text, 'Tom & "Goldberry" <3')
+        self.assertEqual(root.find("{urn:x}link").get("href"), "/a?b=1&c=2")
+
+
+class TestWriteFeeds(TempDirTestCase):
+    def tearDown(self):
+        super().tearDown()
+        feeds.SITEMAP_MAX_URLS = 50000
+
+    def parse(self, name):
+        return ET.parse(os.path.join(self.root, name)).getroot()
+
+    def test_sitemap(self):
+        write_sitemap(self.root, "https://example.com/", [(os.path.join("blog", "index.html"), 0), ("index.html", 86400)])
+        root = self.parse("sitemap.xml")
+        self.assertEqual(root.tag, SITEMAP + "urlset")
+        self.assertEqual(
+            [url.find(SITEMAP + "loc").text for url in root],
+            ["https://example.com/blog/", "https://example.com/"],
+        )
+        self.assertEqual(root[1].find(SITEMAP + "lastmod").text, "1970-01-02T00:00:00Z")
+
+    def test_large_sitemap_is_split(self):
+        feeds.SITEMAP_MAX_URLS = 2
+        pages = [(f"p{i}.html", i) for i in range(5)]
+        write_sitemap(self.root, "https://example.com/", pages)
+        root = self.parse("sitemap.xml")
+        self.assertEqual(root.tag, SITEMAP + "sitemapindex")
+        self.assertEqual([s.find(SITEMAP + "loc").text for s in root], [f"https://example.com/sitemap-{n}.xml" for n in (1, 2, 3)])
+        self.assertEqual(len(self.parse("sitemap-3.xml")), 1)
+
+        write_sitemap(self.root, "https://example.com/", pages[:3])
+        self.assertEqual(sorted(os.listdir(self.root)), ["sitemap-1.xml", "sitemap-2.xml", "sitemap.xml"])
+        feeds.SITEMAP_MAX_URLS = 50000
+        write_sitemap(self.root, "https://example.com/", pages[:3])
+        self.assertEqual(os.listdir(self.root), ["sitemap.xml"])
+
+    def test_feed_keeps_newest_entries(self):
+        entries = [(f"https://example.com/blog/p{i}/", f"Post {i}", i * 60) for i in range(25)]
+        path = os.path.join(self.root, "atom.xml")
+        self.assertTrue(write_feed(path, "https://example.com/blog/atom.xml", "https://example.com/blog/", "Blog", "Me", entries))
+        root = self.parse("atom.xml")
+        titles = [entry.find(ATOM + "title").text for entry in root.findall(ATOM + "entry")]
+        self.assertEqual(titles, [f"Post {i}" for i in range(24, 4, -1)])
+        self.assertEqual(root.find(ATOM + "updated").text, "1970-01-01T00:24:00Z")
+        self.assertFalse(write_feed(path, "https://example.com/blog/atom.xml", "https://example.com/blog/", "Blog", "Me", entries))
+
+
+class TestBuildFeeds(TempDirTestCase):
+    def test_feed_from_manifest_metadata(self):
+        root = self.root
+        template = self.write("template.html", "{{ Content }}")
+        self.write("content/index.md", "# My Site")
+        self.write("content/blog/index.md", "# My Blog")
+        os.utime(self.write("content/blog/a.md", "# First"), (1000, 1000))
+        os.utime(self.write("content/blog/b.md", "# Second"), (2000, 2000))
+        output = os.path.join(root, "docs")
+
+        def build(**kwargs):
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_site(
+                    "/",
+                    output_dir=output,
+                    content_dir=os.path.join(root, "content"),
+                    static_dir=os.path.join(root, "static"),
+                    template_path=template,
+                    layouts_dir=os.path.join(root, "layouts"),
+                    site_url="https://example.com",
+                    **kwargs,
+                )
+
+        os.makedirs(os.path.join(root, "static"))
+        build(incremental=True, sitemap=True, feed_section="blog")
+        feed = ET.parse(os.path.join(output, "blog", "atom.xml")).getroot()
+        self.assertEqual(feed.find(ATOM + "title").text, "My Blog")
+        self.assertEqual(feed.find(ATOM + "author/" + ATOM + "name").text, "My Site")
+        self.assertEqual(
+            [entry.find(ATOM + "id").text for entry in feed.findall(ATOM + "entry")],
+            ["https://example.com/blog/b.html", "https://example.com/blog/a.html"],
+        )
+
+        # A new template rebuilds every page, but unchanged sources keep their update time
+        os.utime(os.path.join(root, "content", "blog", "a.md"), (3000, 3000))
+        self.write("template.html", "<main>{{ Content }}</main>")
+        build(incremental=True, sitemap=True, feed_section="blog")
+        feed = ET.parse(os.path.join(output, "blog", "atom.xml")).getroot()
+        self.assertEqual(feed.find(ATOM + "entry/" + ATOM + "title").text, "Second")
+
+        build(incremental=True)
+        self.assertFalse(os.path.exists(os.path.join(output, "sitemap.xml")))
+        self.assertFalse(os.path.exists(os.path.join(output, "blog", "atom.xml")))
+
+
+if __name__ == "__main__":
+    unittest.main()
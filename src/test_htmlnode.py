@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from htmlnode import HtmlNode, LeafNode, ParentNode
@@ -52,4 +53,34 @@ class TestHtmlNode(unittest.TestCase):
         self.assertEqual(
             parent_node.to_html(),
             "<div><span><b>grandchild</b></span></div>",
-        )
\ No newline at end of file
+        )
+
+    def test_render_to_matches_to_html(self):
+        node = ParentNode("ul", [
+            ParentNode("li", [LeafNode("b", "one"), LeafNode(None, " item")]),
+            ParentNode("li", [LeafNode("a", "two", {"href": "/two"})], props={"class": "x"}),
+        ])
+        out = io.StringIO()
+        node.render_to(out)
+        self.assertEqual(out.getvalue(), node.to_html())
+        self.assertEqual(
+            out.getvalue(),
+            '<ul><li><b>one</b> item</li><li class="x"><a href="/two">two</a></li></ul>',
+        )
+
+    def test_deep_tree_renders_without_recursion(self):
+        node = LeafNode("span", "leaf")
+        for _ in range(5000):
+            node = ParentNode("div", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<div><div>"))
+        self.assertEqual(len(html), 5000 * len("<div></div>") + len("<span>leaf</span>"))
+
+    def test_nodes_are_slotted(self):
+        leaf = LeafNode("p", "text")
+        parent = ParentNode("div", [leaf])
+        self.assertFalse(hasattr(leaf, "__dict__"))
+        self.assertFalse(hasattr(parent, "__dict__"))
+        self.assertEqual(leaf.children, [])
+        self.assertEqual(leaf, HtmlNode("p", "text", [], None))
+        self.assertEqual(repr(leaf), "HtmlNode(p, text, [], None)")
@@ -0,0 +1,95 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from build import build_site
+from fixtures import TempDirTestCase
+from linkcheck import BrokenLinksError, check_references, find_lines, output_index, target_path
+from manifest import MANIFEST_NAME
+
+
+class TestTargets(unittest.TestCase):
+    def test_output_index(self):
+        index = output_index(["index.html", os.path.join("blog", "tom", "index.html"), "about.html", "a.css"])
+        self.assertEqual(
+            index,
+            {"index.html", "", "blog/tom/index.html", "blog/tom", "about.html", "about", "a.css"},
+        )
+
+    def test_target_path(self):
+        page = os.path.join("blog", "tom", "index.html")
+        self.assertEqual(target_path("/", page), "")
+        self.assertEqual(target_path("/blog/majesty/#top", page), "blog/majesty")
+        self.assertEqual(target_path("../majesty?x=1", page), "blog/majesty")
+        self.assertEqual(target_path("tom%20bombadil.png", page), "blog/tom/tom bombadil.png")
+        self.assertEqual(target_path("b.html", "about.html"), "b.html")
+        self.assertEqual(target_path("../../../x", page), "../x")
+        self.assertIsNone(target_path("?page=2", page))
+
+    def test_find_lines(self):
+        with tempfile.TemporaryDirectory() as root:
+            md_path = os.path.join(root, "a.md")
+            with open(md_path, "w", encoding="utf-8") as f:
+                f.write("# A\n\n[x](/gone) and [y](/gone)\n\n![z](/img.png)\n")
+            self.assertEqual(find_lines(md_path, ["/gone", "/img.png", "/other"]), {"/gone": [3], "/img.png": [5], "/other": [None]})
+
+    def test_check_references(self):
+        with tempfile.TemporaryDirectory() as root:
+            md_path = os.path.join(root, "a.md")
+            with open(md_path, "w", encoding="utf-8") as f:
+                f.write("[ok](/)\n[gone](/gone)\n![img](pic.png)\n")
+            pages = {
+                md_path: {
+                    "output": os.path.join(root, "docs", "index.html"),
+                    "references": ["/", "/gone"],
+                    "relative_links": [],
+                    "images": ["pic.png"],
+                }
+            }
+            index = output_index(["index.html"])
+            self.assertEqual(
+                check_references(pages, os.path.join(root, "docs"), index),
+                [(md_path, 2, "link", "/gone"), (md_path, 3, "image", "pic.png")],
+            )
+            index.add("pic.png")
+            self.assertEqual(len(check_references(pages, os.path.join(root, "docs"), index)), 1)
+
+
+class TestBuildCheck(TempDirTestCase):
+    def test_strict_fails_after_writing_the_site(self):
+        root = self.root
+        self.write("template.html", "{{ Content }}")
+        self.write("static/images/a.png", "png")
+        self.write("content/index.md", "# Home\n\n[Blog](/blog/) ![a](/images/a.png)")
+        self.write("content/blog/index.md", "# Blog\n\n[Home](../) [Old](../old/)")
+        output = os.path.join(root, "docs")
+
+        def build(**kwargs):
+            log = io.StringIO()
+            with contextlib.redirect_stdout(log):
+                build_site(
+                    "/site/",
+                    output_dir=output,
+                    content_dir=os.path.join(root, "content"),
+                    static_dir=os.path.join(root, "static"),
+                    template_path=os.path.join(root, "template.html"),
+                    layouts_dir=os.path.join(root, "layouts"),
+                    **kwargs,
+                )
+            return log.getvalue()
+
+        log = build(check_links=True, fingerprint_assets=True)
+        self.assertIn(f"{os.path.join(root, 'content', 'blog', 'index.md')}:3: broken link ../old/", log)
+        self.assertIn("Checked links: 1 broken", log)
+        with self.assertRaises(BrokenLinksError):
+            build(strict_links=True, incremental=True)
+        self.assertTrue(os.path.exists(os.path.join(output, MANIFEST_NAME)))
+
+        self.write("content/old/index.md", "# Old")
+        self.assertIn("Checked links: 0 broken", build(strict_links=True, incremental=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from manifest import HashCache, build_settings, load_manifest, plan_incremental_build, record_page, remove_output, save_manifest
+
+
+class TestIncrementalPlan(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = self.write("template.html", "<html>{{ Content }}</html>")
+        self.a = self.write("content/a.md", "# A")
+        self.b = self.write("content/b.md", "# B")
+        self.pages = [
+            (self.a, os.path.join(self.root, "docs/a.html")),
+            (self.b, os.path.join(self.root, "docs/b.html")),
+        ]
+
+    def build_once(self, settings):
+        to_build, _, manifest = plan_incremental_build(self.pages, {}, settings)
+        for _, dest_path in to_build:
+            self.write(os.path.relpath(dest_path, self.root), "out")
+        return manifest
+
+    def test_first_build_builds_everything(self):
+        settings = build_settings("/")
+        to_build, to_delete, _ = plan_incremental_build(self.pages, {}, settings)
+        self.assertEqual(to_build, self.pages)
+        self.assertEqual(to_delete, [])
+
+    def test_unchanged_pages_are_skipped(self):
+        settings = build_settings("/")
+        manifest = self.build_once(settings)
+        self.write("content/b.md", "# B changed")
+        to_build, to_delete, _ = plan_incremental_build(self.pages, manifest, settings)
+        self.assertEqual(to_build, [self.pages[1]])
+        self.assertEqual(to_delete, [])
+
+    def test_settings_change_rebuilds_everything(self):
+        manifest = self.build_once(build_settings("/"))
+        to_build, _, _ = plan_incremental_build(self.pages, manifest, build_settings("/site/"))
+        self.assertEqual(to_build, self.pages)
+
+    def test_removed_source_deletes_output(self):
+        manifest = self.build_once(build_settings("/"))
+        settings = build_settings("/")
+        to_build, to_delete, new_manifest = plan_incremental_build(self.pages[:1], manifest, settings)
+        self.assertEqual(to_build, [])
+        self.assertEqual(to_delete, [self.pages[1][1]])
+        self.assertNotIn(self.b, new_manifest["pages"])
+
+    def test_layout_change_only_rebuilds_its_pages(self):
+        blog_layout = self.write("layouts/blog.html", "<main>{{ Content }}</main>")
+        templates = {self.a: self.template, self.b: blog_layout}
+
+        def inputs_for(md_path):
+            return [md_path, templates[md_path]]
+
+        settings = build_settings("/")
+        to_build, _, manifest = plan_incremental_build(self.pages, {}, settings, inputs_for)
+        for md_path, dest_path in to_build:
+            self.write(os.path.relpath(dest_path, self.root), "out")
+            record_page(manifest, md_path, dest_path, {"inputs": inputs_for(md_path)}, HashCache())
+
+        self.write("layouts/blog.html", "<section>{{ Content }}</section>")
+        to_build, _, _ = plan_incremental_build(self.pages, manifest, settings, inputs_for)
+        self.assertEqual(to_build, [self.pages[1]])
+
+        # A page that starts using a different layout is rebuilt even if nothing else changed
+        templates[self.a] = blog_layout
+        to_build, _, _ = plan_incremental_build(self.pages, manifest, settings, inputs_for)
+        self.assertEqual(to_build, self.pages)
+
+    def test_manifest_round_trip(self):
+        path = os.path.join(self.root, "docs", ".ssg-manifest.json")
+        self.assertEqual(load_manifest(path), {"settings": {}, "pages": {}})
+        manifest = self.build_once(build_settings("/"))
+        save_manifest(path, manifest)
+        self.assertEqual(load_manifest(path), manifest)
+
+    def test_remove_output_prunes_empty_dirs(self):
+        output_dir = os.path.join(self.root, "docs")
+        dest = self.write("docs/blog/post/index.html", "out")
+        remove_output(dest, output_dir)
+        self.assertFalse(os.path.exists(os.path.join(output_dir, "blog")))
+        self.assertTrue(os.path.isdir(output_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import io
+import unittest
+
+from minify import HtmlMinifier, minify_css
+
+
+def minify_html(html, chunk_size=None):
+    out = io.StringIO()
+    minifier = HtmlMinifier(out)
+    step = chunk_size or max(1, len(html))
+    for i in range(0, len(html), step):
+        minifier.write(html[i:i + step])
+    minifier.close()
+    return out.getvalue()
+
+
+class TestHtmlMinifier(unittest.TestCase):
+    def test_whitespace_between_blocks_is_dropped(self):
+        html = '<!doctype html>\n<html>\n  <head>\n    <meta charset="utf-8" />\n    <title> Hi </title>\n  </head>\n</html>\n'
+        self.assertEqual(minify_html(html), '<!doctype html><html><head><meta charset="utf-8"/><title>Hi</title></head></html>')
+
+    def test_inline_whitespace_collapses_to_one_space(self):
+        self.assertEqual(minify_html("<p>a  \n b <b>c</b>\n<i>d</i></p>"), "<p>a b <b>c</b> <i>d</i></p>")
+
+    def test_comments_are_dropped(self):
+        self.assertEqual(minify_html("<p>a <!-- note --> b</p><!--[if IE]>x<![endif]-->"), "<p>a b</p><!--[if IE]>x<![endif]-->")
+
+    def test_preformatted_contents_are_kept(self):
+        html = "<pre><code>  x\n    <b>y</b>  </code></pre>\n<p>a <code> b  c </code> d</p><script>if (a < b)  {}</script>"
+        self.assertEqual(
+            minify_html(html),
+            "<pre><code>  x\n    <b>y</b>  </code></pre><p>a <code> b  c </code> d</p><script>if (a < b)  {}</script>",
+        )
+
+    def test_attribute_values_and_stray_brackets(self):
+        self.assertEqual(minify_html('<p  title="a  >  b" >1 < 2</p>'), '<p title="a  >  b">1 < 2</p>')
+
+    def test_characters_that_lengthen_when_lowered(self):
+        # "İ".lower() is two characters long
+        self.assertEqual(
+            minify_html("<h1>İİİİİİİ</h1>\n<pre><code>code\n</CODE></pre>\n<p>hello world</p>"),
+            "<h1>İİİİİİİ</h1><pre><code>code\n</CODE></pre><p>hello world</p>",
+        )
+
+    def test_chunking_does_not_change_output(self):
+        html = '<html>\n <body>\n  <p>a  <b>b</b> <!-- c -->  d</p>\n<pre> x </PRE> <a href="/x"  >e</a>\n</body></html>'
+        expected = minify_html(html)
+        for chunk_size in (1, 2, 3, 5, 8):
+            self.assertEqual(minify_html(html, chunk_size), expected)
+
+
+class TestMinifyCss(unittest.TestCase):
+    def test_minify(self):
+        css = "/* header */\nbody {\n  color : red;\n  font-family: \"Open  Sans\", serif;\n}\n\nul > li,\nol li:hover { margin: 0 auto; }\n/*! keep */"
+        self.assertEqual(
+            minify_css(css),
+            'body{color :red;font-family:"Open  Sans",serif}ul>li,ol li:hover{margin:0 auto}/*! keep */',
+        )
+
+    def test_descendant_pseudo_class_keeps_its_space(self):
+        self.assertEqual(minify_css("a :hover { x: y }"), "a :hover{x:y}")
+
+
+if __name__ == "__main__":
+    unittest.main()
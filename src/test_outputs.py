@@ -0,0 +1,101 @@
+import contextlib
+import io
+import os
+import stat
+import tempfile
+import unittest
+
+from build import build_site
+from fixtures import TempDirTestCase
+from outputs import OutputFile, ensure_dirs
+
+
+class TestOutputFile(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.root, "blog", "index.html")
+
+    def write_output(self, *chunks):
+        with OutputFile(self.dest) as f:
+            for chunk in chunks:
+                f.write(chunk)
+        return f.changed
+
+    def read_output(self):
+        with open(self.dest, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def test_writes_new_file_with_plain_mode(self):
+        self.assertTrue(self.write_output("<p>", "héllo", "</p>"))
+        self.assertEqual(self.read_output(), "<p>héllo</p>")
+        plain = os.path.join(self.root, "plain.html")
+        open(plain, "w").close()
+        self.assertEqual(stat.S_IMODE(os.stat(self.dest).st_mode), stat.S_IMODE(os.stat(plain).st_mode))
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+    def test_identical_content_leaves_file_untouched(self):
+        self.write_output("<p>hello</p>")
+        os.utime(self.dest, ns=(1_000_000_000, 1_000_000_000))
+        self.assertFalse(self.write_output("<p>", "hello</p>"))
+        self.assertEqual(os.stat(self.dest).st_mtime_ns, 1_000_000_000)
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+    def test_changed_content_same_size_is_written(self):
+        self.write_output("<p>hello</p>")
+        self.assertTrue(self.write_output("<p>jello</p>"))
+        self.assertEqual(self.read_output(), "<p>jello</p>")
+
+    def test_failure_keeps_previous_content(self):
+        self.write_output("<p>hello</p>")
+        with self.assertRaises(RuntimeError):
+            with OutputFile(self.dest) as f:
+                f.write("<p>half")
+                raise RuntimeError("render failed")
+        self.assertEqual(self.read_output(), "<p>hello</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+
+class TestEnsureDirs(unittest.TestCase):
+    def test_creates_each_parent(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = [os.path.join(root, *parts) for parts in (("a", "b", "x.html"), ("a", "y.html"), ("c", "z.html"))]
+            ensure_dirs(paths)
+            for path in paths:
+                self.assertTrue(os.path.isdir(os.path.dirname(path)))
+
+
+class TestFullBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.docs = os.path.join(self.root, "docs")
+        self.write("template.html", "<body>{{ Content }}</body>")
+        self.write("content/index.md", "# Home")
+        self.write("content/old/index.md", "# Old")
+        self.write("static/a.css", "a{}")
+        self.write("static/b.css", "b{}")
+
+    def build(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_site(
+                output_dir=self.docs,
+                content_dir=os.path.join(self.root, "content"),
+                static_dir=os.path.join(self.root, "static"),
+                template_path=os.path.join(self.root, "template.html"),
+                layouts_dir=os.path.join(self.root, "layouts"),
+            )
+
+    def test_full_build_keeps_unchanged_outputs_and_removes_stale_ones(self):
+        self.build()
+        for name in ("index.html", "a.css"):
+            os.utime(os.path.join(self.docs, name), ns=(1_000_000_000, 1_000_000_000))
+        self.write("content/index.md", "# Home")
+        os.remove(os.path.join(self.root, "content", "old", "index.md"))
+        os.remove(os.path.join(self.root, "static", "b.css"))
+        self.build()
+        self.assertEqual(os.stat(os.path.join(self.docs, "index.html")).st_mtime_ns, 1_000_000_000)
+        self.assertEqual(os.stat(os.path.join(self.docs, "a.css")).st_mtime_ns, 1_000_000_000)
+        self.assertEqual(sorted(os.listdir(self.docs)), [".ssg-manifest.json", "a.css", "index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import io
+import os
+import time
+import unittest
+
+from fixtures import TempDirTestCase
+from parsecache import PARSER_VERSION, ParseCache, _CachedDocument, _write_frame
+from textnode import MarkdownDocument, TextType
+from utils import generate_page
+
+DOCUMENTS = [
+    "# Title\n\nSee [a](/a) and ![i](/i.png) or [x](https://x.org).\n\n- one\n- [two](/two)",
+    "- only\n- a list",
+    "1. only\n2. [ordered](/o)",
+    "```\ncode /a\n\n[not](/link)\n```\n\n> quote with **bold**",
+]
+
+
+class TestParseCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = ParseCache(os.path.join(self.root, ".ssg-cache"))
+
+    def render(self, md_path, url_prefix="/"):
+        links = []
+        out = io.StringIO()
+        with open(md_path, "r", encoding="utf-8") as src:
+            document = self.cache.document(md_path, src, on_textnodes=links.extend, url_prefix=url_prefix)
+            document.render_to(out)
+        return document, out.getvalue(), [node.link for node in links if node.text_type == TextType.LINK]
+
+    def test_miss_then_hit_render_like_the_parser(self):
+        for index, markdown in enumerate(DOCUMENTS):
+            md_path = self.write(f"doc{index}.md", markdown)
+            for url_prefix in ("/", "/site/", "../"):
+                with self.subTest(document=index, url_prefix=url_prefix):
+                    expected_links = []
+
+                    def collect(textnodes):
+                        expected_links.extend(n.link for n in textnodes if n.text_type == TextType.LINK)
+
+                    expected = io.StringIO()
+                    MarkdownDocument(markdown.splitlines(), on_textnodes=collect, url_prefix=url_prefix).render_to(expected)
+                    for _ in range(2):
+                        _, html, links = self.render(md_path, url_prefix)
+                        self.assertEqual(html, expected.getvalue())
+                        self.assertEqual(links, expected_links)
+
+            document, _, _ = self.render(md_path)
+            self.assertIsInstance(document, _CachedDocument)
+
+    def test_entries_are_keyed_by_content_and_version(self):
+        a = self.write("a.md", "# Same")
+        b = self.write("b.md", "# Same")
+        self.render(a)
+        document, _, _ = self.render(b)
+        self.assertIsInstance(document, _CachedDocument)
+        self.assertTrue(self.cache.key_for(a).endswith(f".v{PARSER_VERSION}"))
+        self.write("a.md", "# Changed")
+        document, html, _ = self.render(a)
+        self.assertNotIsInstance(document, _CachedDocument)
+        self.assertEqual(html, "<div><h1>Changed</h1></div>")
+
+    def test_corrupt_entry_falls_back_to_parsing(self):
+        template = self.write("template.html", "{{ Content }}")
+        md_path = self.write("page.md", "# Page\n\n[home](/)")
+        dest_path = os.path.join(self.root, "out", "page.html")
+        generate_page(md_path, template, dest_path, parse_cache=self.cache)
+        with open(self.cache.path_for(self.cache.key_for(md_path)), "r+b") as f:
+            f.truncate(8)
+        record = generate_page(md_path, template, dest_path, "/site/", parse_cache=self.cache)
+        with open(dest_path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), '<div><h1>Page</h1><p><a href="/site/">home</a></p></div>')
+        self.assertEqual(record["references"], ["/"])
+
+    def test_malformed_entry_falls_back_to_parsing(self):
+        template = self.write("template.html", "{{ Content }}")
+        md_path = self.write("page.md", "# Page\n\n[home](/)")
+        dest_path = os.path.join(self.root, "out", "page.html")
+        frames = [
+            [[1, 2, 3]],
+            [[("div", None, None, 5)], {"links": []}],
+            [[("div", None, None, [])], {"nodes": []}],
+        ]
+        for entry in frames:
+            with self.subTest(entry=entry):
+                generate_page(md_path, template, dest_path, parse_cache=self.cache)
+                with open(self.cache.path_for(self.cache.key_for(md_path)), "wb") as f:
+                    for frame in entry:
+                        _write_frame(f, frame)
+                record = generate_page(md_path, template, dest_path, parse_cache=self.cache)
+                with open(dest_path, "r", encoding="utf-8") as f:
+                    self.assertEqual(f.read(), '<div><h1>Page</h1><p><a href="/">home</a></p></div>')
+                self.assertEqual(record["references"], ["/"])
+
+    def test_prune_evicts_least_recently_used(self):
+        paths = [self.write(f"doc{i}.md", f"# Doc {i}\n\n" + "word " * 200) for i in range(3)]
+        for i, md_path in enumerate(paths):
+            self.render(md_path)
+            entry = self.cache.path_for(self.cache.key_for(md_path))
+            os.utime(entry, ns=(time.time_ns(), i * 10**9))
+        self.render(paths[0])  # a hit makes doc0 the most recently used
+        stale = os.path.join(self.cache.dir, "old.v0")
+        self.write(os.path.relpath(stale, self.root), "x")
+
+        size = os.path.getsize(self.cache.path_for(self.cache.key_for(paths[0])))
+        self.cache.max_bytes = size * 2
+        self.assertEqual(self.cache.prune(), 2)
+        remaining = sorted(os.listdir(self.cache.dir))
+        expected = sorted(self.cache.key_for(p) for p in (paths[0], paths[2]))
+        self.assertEqual(remaining, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
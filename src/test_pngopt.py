@@ -0,0 +1,90 @@
+import os
+import struct
+import unittest
+import zlib
+
+from assets import AssetManifest
+from fixtures import TempDirTestCase
+from pngopt import PNG_SIGNATURE, PngOptimizer, image_size, iter_chunks, make_chunk, optimize_png
+from textnode import TextNode, TextType, text_node_to_html_node
+
+
+def make_png(width=64, height=32, extra_chunks=(), idat_parts=3):
+    rows = b"".join(b"\x00" + bytes((x * y) % 256 for x in range(width * 3)) for y in range(height))
+    data = zlib.compress(rows, 1)
+    step = len(data) // idat_parts + 1
+    chunks = [make_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))]
+    chunks += [make_chunk(chunk_type, body) for chunk_type, body in extra_chunks]
+    chunks += [make_chunk(b"IDAT", data[i:i + step]) for i in range(0, len(data), step)]
+    chunks.append(make_chunk(b"IEND", b""))
+    return PNG_SIGNATURE + b"".join(chunks)
+
+
+def pixels(png):
+    return zlib.decompress(b"".join(body for chunk_type, body in iter_chunks(png) if chunk_type == b"IDAT"))
+
+
+class TestOptimizePng(unittest.TestCase):
+    def test_lossless_and_smaller(self):
+        png = make_png(extra_chunks=[(b"tEXt", b"Comment\x00" + b"x" * 500), (b"sRGB", b"\x00")])
+        optimized = optimize_png(png)
+        self.assertLess(len(optimized), len(png))
+        self.assertEqual(pixels(optimized), pixels(png))
+        types = [chunk_type for chunk_type, _ in iter_chunks(optimized)]
+        self.assertEqual(types, [b"IHDR", b"sRGB", b"IDAT", b"IEND"])
+
+    def test_animated_png_is_untouched(self):
+        png = make_png(extra_chunks=[(b"acTL", struct.pack(">II", 1, 0))])
+        self.assertIs(optimize_png(png), png)
+
+    def test_corrupt_png_is_rejected(self):
+        png = bytearray(make_png())
+        png[40] ^= 0xFF
+        with self.assertRaises(ValueError):
+            optimize_png(bytes(png))
+
+    def test_truncated_png_is_rejected(self):
+        png = make_png()
+        chunk_end = len(png) - len(make_chunk(b"IEND", b""))
+        for data in (png[: len(png) // 2], png[:chunk_end], png[:10]):
+            with self.subTest(size=len(data)):
+                with self.assertRaises(ValueError):
+                    optimize_png(data)
+
+
+class TestPngOptimizer(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.root, "a.png")
+        with open(self.src, "wb") as f:
+            f.write(make_png(extra_chunks=[(b"tEXt", b"Comment\x00" + b"x" * 500)]))
+
+    def test_results_are_cached_by_content(self):
+        optimizer = PngOptimizer(os.path.join(self.root, "cache"))
+        path = optimizer.source_for(self.src)
+        self.assertNotEqual(path, self.src)
+        self.assertLess(os.path.getsize(path), os.path.getsize(self.src))
+        mtime = os.stat(path).st_mtime_ns
+        self.assertEqual(optimizer.source_for(self.src), path)
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+
+        css = os.path.join(self.root, "a.css")
+        self.assertEqual(optimizer.source_for(css), css)
+
+    def test_truncated_png_is_published_as_is(self):
+        with open(self.src, "rb") as f:
+            data = f.read()
+        with open(self.src, "wb") as f:
+            f.write(data[: len(data) // 2])
+        optimizer = PngOptimizer(os.path.join(self.root, "cache"))
+        self.assertEqual(optimizer.source_for(self.src), self.src)
+
+    def test_image_size_and_img_attributes(self):
+        self.assertEqual(image_size(self.src), (64, 32))
+        assets = AssetManifest.build(self.root, ["a.png"], fingerprint=False, measure_images=True)
+        node = text_node_to_html_node(TextNode("A", TextType.IMAGE, "/a.png"), "/site/", assets)
+        self.assertEqual(node.to_html(), '<img src="/site/a.png" alt="A" width="64" height="32"/>')
+
+
+if __name__ == "__main__":
+    unittest.main()
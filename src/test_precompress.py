@@ -0,0 +1,63 @@
+import gzip
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from precompress import CODECS, precompress_outputs, register_codec
+
+
+class TestPrecompress(TempDirTestCase):
+    def tearDown(self):
+        super().tearDown()
+        CODECS.pop("rev", None)
+
+    def exists(self, rel_path):
+        return os.path.exists(os.path.join(self.root, rel_path))
+
+    def test_writes_siblings_for_text_outputs(self):
+        page = self.write("blog/index.html", "<p>hello</p>" * 100)
+        self.write("images/a.png", "png" * 100)
+        precompress_outputs(self.root, ["blog/index.html", "images/a.png"])
+        with gzip.open(page + ".gz", "rb") as f:
+            self.assertEqual(f.read(), b"<p>hello</p>" * 100)
+        self.assertFalse(self.exists("images/a.png.gz"))
+
+    def test_incompressible_files_get_no_sibling(self):
+        self.write("a.css", "a{}")
+        precompress_outputs(self.root, ["a.css"])
+        self.assertFalse(self.exists("a.css.gz"))
+
+    def test_unchanged_files_are_skipped_and_removed_ones_cleaned_up(self):
+        self.write("a.html", "a" * 1000)
+        self.write("b.html", "b" * 1000)
+        state = precompress_outputs(self.root, ["a.html", "b.html"], jobs=2)
+        os.remove(os.path.join(self.root, "a.html.gz"))
+        os.remove(os.path.join(self.root, "b.html"))
+        state = precompress_outputs(self.root, ["a.html"], state)
+        # a.html is unchanged, so its sibling isn't rewritten
+        self.assertFalse(self.exists("a.html.gz"))
+        self.assertFalse(self.exists("b.html.gz"))
+        self.assertEqual(list(state["files"]), ["a.html"])
+
+        self.write("a.html", "c" * 1000)
+        precompress_outputs(self.root, ["a.html"], state)
+        self.assertTrue(self.exists("a.html.gz"))
+
+    def test_custom_codecs_and_disabling(self):
+        register_codec("rev", lambda data: data[:10])
+        self.write("a.js", "x" * 1000)
+        state = precompress_outputs(self.root, ["a.js"], codecs=("gz", "rev"))
+        with open(os.path.join(self.root, "a.js.rev"), "rb") as f:
+            self.assertEqual(f.read(), b"x" * 10)
+        state = precompress_outputs(self.root, ["a.js"], state, codecs=("gz",))
+        self.assertFalse(self.exists("a.js.rev"))
+        self.assertIsNone(precompress_outputs(self.root, ["a.js"], state, codecs=()))
+        self.assertFalse(self.exists("a.js.gz"))
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            precompress_outputs(self.root, [], codecs=("br",))
+
+
+if __name__ == "__main__":
+    unittest.main()
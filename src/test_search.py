@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+
+from fixtures import TempDirTestCase
+from parsecache import ParseCache
+from search import assign_ids, decode_postings, encode_postings, shard_file, stem, tokenize, write_search_index
+from utils import generate_page
+
+
+class TestTokenize(unittest.TestCase):
+    def test_stem(self):
+        self.assertEqual(stem("hobbits"), "hobbit")
+        self.assertEqual(stem("walking"), "walk")
+        self.assertEqual(stem("walked"), "walk")
+        self.assertEqual(stem("stories"), "story")
+        self.assertEqual(stem("glass"), "glass")
+        self.assertEqual(stem("is"), "is")
+
+    def test_tokenize(self):
+        self.assertEqual(list(tokenize("The Hobbits, walking to Mordor (again)!")), ["hobbit", "walk", "mordor", "again"])
+        self.assertEqual(list(tokenize("Éowyn a I")), ["éowyn"])
+
+
+class TestIndexFormat(unittest.TestCase):
+    def test_postings_round_trip(self):
+        postings = {7: 1, 2: 3, 30: 2}
+        self.assertEqual(encode_postings(postings), [2, 3, 5, 1, 23, 2])
+        self.assertEqual(decode_postings(encode_postings(postings)), postings)
+
+    def test_ids_are_stable_and_reused(self):
+        ids = assign_ids(["a.md", "b.md", "c.md"], {})
+        self.assertEqual(ids, {"a.md": 0, "b.md": 1, "c.md": 2})
+        self.assertEqual(assign_ids(["c.md", "d.md"], ids), {"c.md": 2, "d.md": 0})
+
+    def test_names(self):
+        self.assertEqual(shard_file("ho"), "ho.json")
+        self.assertEqual(shard_file("éo"), "xc3a96f.json")
+
+
+class TestWriteSearchIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.search_dir = os.path.join(self.root, "search")
+
+    def read_json(self, name):
+        with open(os.path.join(self.search_dir, name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_writes_shards_and_updates_incrementally(self):
+        pages = {
+            "a.md": ("index.html", "Home", {"hobbit": 2, "shire": 1}),
+            "b.md": (os.path.join("blog", "index.html"), "Blog", {"hobbit": 1, "ring": 1}),
+        }
+        ids = write_search_index(self.root, pages)
+        index = self.read_json("index.json")
+        self.assertEqual(index["shards"], {"ho": "ho.json", "sh": "sh.json", "ri": "ri.json"})
+        self.assertEqual(self.read_json("pages.json"), [["", "Home"], ["blog/", "Blog"]])
+        self.assertEqual(self.read_json("ho.json"), {"hobbit": [0, 2, 1, 1]})
+
+        del pages["a.md"]
+        pages["b.md"] = (os.path.join("blog", "index.html"), "Blog", {"hobbit": 1})
+        pages["c.md"] = ("c.html", "C", {"hobbit": 4})
+        write_search_index(self.root, pages, ids)
+        self.assertEqual(self.read_json("pages.json"), [["c.html", "C"], ["blog/", "Blog"]])
+        self.assertEqual(self.read_json("ho.json"), {"hobbit": [0, 4, 1, 1]})
+        self.assertEqual(sorted(os.listdir(self.search_dir)), ["ho.json", "index.json", "pages.json"])
+
+        os.utime(os.path.join(self.search_dir, "ho.json"), ns=(1, 1))
+        write_search_index(self.root, pages, assign_ids(list(pages), ids))
+        self.assertEqual(os.stat(os.path.join(self.search_dir, "ho.json")).st_mtime_ns, 1)
+
+
+class TestPageTerms(unittest.TestCase):
+    def test_cache_hits_still_see_all_text(self):
+        with tempfile.TemporaryDirectory() as root:
+            md_path = os.path.join(root, "page.md")
+            with open(md_path, "w", encoding="utf-8") as f:
+                f.write("# Hobbits\n\nSecond **breakfast** and [the Shire](/shire)")
+            template = os.path.join(root, "template.html")
+            with open(template, "w", encoding="utf-8") as f:
+                f.write("{{ Content }}")
+            cache = ParseCache(os.path.join(root, "cache"))
+            dest = os.path.join(root, "out", "page.html")
+            first = generate_page(md_path, template, dest, parse_cache=cache, index_text=True)
+            again = generate_page(md_path, template, dest, parse_cache=cache, index_text=True)
+            self.assertEqual(first["terms"], {"hobbit": 1, "second": 1, "breakfast": 1, "shire": 1})
+            self.assertEqual(again["terms"], first["terms"])
+            self.assertEqual(again["title"], "Hobbits")
+            self.assertNotIn("terms", generate_page(md_path, template, dest, parse_cache=cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from server import DevBuilder, diff_snapshots, snapshot
+
+
+class TestDevBuilder(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "<body>{{ Content }}</body>")
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/post.md", "# Post")
+        self.write("static/index.css", "body {}")
+        self.builder = DevBuilder(
+            output_dir=self.path("docs"),
+            content_dir=self.path("content"),
+            static_dir=self.path("static"),
+            template_path=self.path("template.html"),
+            layouts_dir=self.path("layouts"),
+        )
+        self.builder.build_all()
+
+    def test_snapshot_diff(self):
+        before = snapshot(self.builder.watched_paths)
+        self.write("content/index.md", "# Home again")
+        os.remove(self.path("content/blog/post.md"))
+        after = snapshot(self.builder.watched_paths)
+        self.assertEqual(
+            diff_snapshots(before, after),
+            {self.path("content/index.md"), self.path("content/blog/post.md")},
+        )
+
+    def test_page_change_rebuilds_only_that_page(self):
+        changed = {self.write("content/index.md", "# Changed")}
+        self.assertEqual(self.builder.rebuild(changed), 1)
+        self.assertEqual(self.read("docs/index.html"), "<body><div><h1>Changed</h1></div></body>")
+
+    def test_removed_page_output_is_deleted(self):
+        path = self.path("content/blog/post.md")
+        os.remove(path)
+        self.builder.rebuild({path})
+        self.assertFalse(os.path.exists(self.path("docs/blog")))
+
+    def test_new_layout_rebuilds_affected_pages(self):
+        changed = {self.write("layouts/blog.html", "<main>{{ Content }}</main>")}
+        self.builder.rebuild(changed)
+        self.assertEqual(self.read("docs/blog/post.html"), "<main><div><h1>Post</h1></div></main>")
+        self.assertEqual(self.read("docs/index.html"), "<body><div><h1>Home</h1></div></body>")
+
+    def test_template_change_rebuilds_its_dependents(self):
+        self.write("layouts/blog.html", "<main>{{ Content }}</main>")
+        self.builder.rebuild({self.path("layouts/blog.html")})
+        changed = {self.write("layouts/blog.html", "<article>{{ Content }}</article>")}
+        self.assertEqual(self.builder.rebuild(changed), 1)
+        self.assertEqual(self.read("docs/blog/post.html"), "<article><div><h1>Post</h1></div></article>")
+
+    def test_static_change_is_synced(self):
+        changed = {self.write("static/index.css", "body { margin: 0 }")}
+        self.builder.rebuild(changed)
+        self.assertEqual(self.read("docs/index.css"), "body { margin: 0 }")
+
+
+if __name__ == "__main__":
+    unittest.main()
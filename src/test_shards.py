@@ -0,0 +1,113 @@
+import contextlib
+import io
+import os
+import unittest
+
+from build import build_site
+from fixtures import TempDirTestCase
+from manifest import MANIFEST_NAME, load_manifest, save_manifest
+from shards import ShardMergeError, parse_shard, select_shard, shard_of
+
+
+class TestShardOf(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for spec in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_stable_partition(self):
+        paths = [f"blog/post{i}.md" for i in range(200)]
+        shards = [shard_of(path, 4) for path in paths]
+        self.assertEqual(shards, [shard_of(path, 4) for path in paths])
+        self.assertEqual(set(shards), {1, 2, 3, 4})
+        self.assertEqual(shard_of(os.path.join("blog", "post1.md"), 4), shard_of("blog/post1.md", 4))
+
+    def test_select_shard_covers_every_page_once(self):
+        pages = [(os.path.join("content", f"p{i}.md"), f"docs/p{i}.html") for i in range(20)]
+        selected = [page for index in (1, 2, 3) for page in select_shard(pages, "content", (index, 3))]
+        self.assertEqual(sorted(selected), sorted(pages))
+
+
+class TestMerge(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = self.write("template.html", '<link href="/a.css">{{ Content }}')
+        self.write("static/a.css", "a{}")
+        for i in range(6):
+            self.write(f"content/p{i}/index.md", f"# Page {i}")
+
+    def build(self, output, **kwargs):
+        # A relative output is taken from the current directory, as main.py does
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_site(
+                "/site/",
+                output_dir=output if kwargs.pop("relative", False) else os.path.join(self.root, output),
+                content_dir=self.content,
+                static_dir=os.path.join(self.root, "static"),
+                template_path=self.template,
+                layouts_dir=os.path.join(self.root, "layouts"),
+                **kwargs,
+            )
+
+    def outputs(self, output):
+        files = {}
+        for current, dirs, names in os.walk(os.path.join(self.root, output)):
+            for name in names:
+                if name != ".ssg-manifest.json":
+                    with open(os.path.join(current, name), encoding="utf-8") as f:
+                        files[os.path.relpath(os.path.join(current, name), os.path.join(self.root, output))] = f.read()
+        return files
+
+    def test_merged_shards_match_a_single_build(self):
+        self.build("whole", search=True)
+        for index in (1, 2):
+            self.build(f"shard{index}", shard=(index, 2), search=True)
+        self.assertNotIn("a.css", self.outputs("shard1"))
+        self.assertFalse(any(path.startswith("search") for path in self.outputs("shard1")))
+        shard_dirs = [os.path.join(self.root, f"shard{index}") for index in (1, 2)]
+        self.build("merged", merge_shards_from=shard_dirs, search=True)
+        self.assertEqual(self.outputs("merged"), self.outputs("whole"))
+        self.assertIn(os.path.join("search", "pa.json"), self.outputs("merged"))
+
+    def test_merge_checks_shards(self):
+        shard_dirs = [os.path.join(self.root, f"shard{index}") for index in (1, 2)]
+        for index in (1, 2):
+            self.build(f"shard{index}", shard=(index, 2))
+        with self.assertRaisesRegex(ShardMergeError, "1/N to N/N"):
+            self.build("merged", merge_shards_from=shard_dirs[:1])
+        with self.assertRaisesRegex(ShardMergeError, "different settings"):
+            self.build("merged", merge_shards_from=shard_dirs, site_url="https://example.com")
+
+        manifests = [load_manifest(os.path.join(shard_dir, MANIFEST_NAME)) for shard_dir in shard_dirs]
+        md_path, entry = next(iter(manifests[0]["pages"].items()))
+        manifests[1]["pages"][md_path] = dict(
+            entry, output=os.path.join(shard_dirs[1], os.path.relpath(entry["output"], shard_dirs[0]))
+        )
+        save_manifest(os.path.join(shard_dirs[1], MANIFEST_NAME), manifests[1])
+        with self.assertRaisesRegex(ShardMergeError, "more than one shard"):
+            self.build("merged", merge_shards_from=shard_dirs)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "merged")))
+
+    def test_merge_shards_moved_after_building(self):
+        self.build("whole")
+        with contextlib.chdir(self.root):
+            for index in (1, 2):
+                # A stale page left in docs by an earlier build isn't part of the shard
+                self.write(f"docs/p{index}/index.html", "stale")
+                self.build("docs", shard=(index, 2), relative=True)
+                os.rename("docs", f"shard{index}")
+            self.build("docs", merge_shards_from=["shard1", "shard2"], relative=True)
+        self.assertEqual(self.outputs("docs"), self.outputs("whole"))
+
+    def test_merge_needs_every_page(self):
+        for index in (1, 2):
+            self.build(f"shard{index}", shard=(index, 2))
+        self.write("content/new/index.md", "# New")
+        with self.assertRaisesRegex(ShardMergeError, "missing"):
+            self.build("merged", merge_shards_from=[os.path.join(self.root, f"shard{index}") for index in (1, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from template import Template, load_template, resolve_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render_slots(self):
+        template = Template("<title>{{ Title }}</title><body>{{Content}}</body>")
+        self.assertEqual(template.slot_names, {"Title", "Content"})
+        self.assertEqual(
+            template.render({"Title": "Hi", "Content": "<p>x</p>"}),
+            "<title>Hi</title><body><p>x</p></body>",
+        )
+
+    def test_repeated_and_missing_slots(self):
+        template = Template("{{ A }}-{{ A }}-{{ B }}")
+        self.assertEqual(template.render({"A": "1"}), "1-1-{{ B }}")
+
+    def test_no_slots(self):
+        self.assertEqual(Template("plain").render({"Title": "x"}), "plain")
+
+    def test_url_prefix_rewrites_literals_only(self):
+        template = Template('<link href="/index.css"/>{{ Content }}').with_url_prefix("/site/")
+        self.assertEqual(
+            template.render({"Content": '<a href="/x">'}),
+            '<link href="/site/index.css"/><a href="/x">',
+        )
+
+
+class TestTemplateFiles(TempDirTestCase):
+    def test_load_template_is_cached(self):
+        path = self.write("template.html", "{{ Content }}")
+        self.assertIs(load_template(path), load_template(path))
+
+    def test_resolve_template(self):
+        default = self.write("template.html", "{{ Content }}")
+        layouts = os.path.join(self.root, "layouts")
+        blog = self.write("layouts/blog.html", "<main>{{ Content }}</main>")
+        self.assertEqual(resolve_template("blog/tom/index.md", default, layouts), blog)
+        self.assertEqual(resolve_template("contact/index.md", default, layouts), default)
+        self.assertEqual(resolve_template("index.md", default, layouts), default)
+
+
+if __name__ == "__main__":
+    unittest.main()
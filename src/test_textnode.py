@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from textnode import (
@@ -12,8 +13,10 @@ from textnode import (
     text_to_textnodes,
     markdown_to_blocks,
     block_to_block_type,
+    iter_blocks,
     BlockType,
     markdown_to_html_node,
+    MarkdownDocument,
 )
 
 
@@ -38,6 +41,11 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", TextType.BOLD, "https://www.boot.dev")
         self.assertNotEqual(node, node2)
 
+    def test_slotted(self):
+        node = TextNode("text", TextType.NORMAL)
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(repr(node), "TextNode(text, Normal Text, None)")
+
     def test_text(self):
         node = TextNode("This is a text node", TextType.NORMAL)
         html_node = text_node_to_html_node(node)
@@ -268,6 +276,32 @@ class TestMarkdownExtraction(unittest.TestCase):
             nodes,
         )
 
+    def test_text_to_textnodes_matches_split_pipeline(self):
+        samples = [
+            "**a `c` b**",
+            "_a **b**_ c",
+            "`[x](y)` after",
+            "[a](x![b)](c) tail",
+            "***bold*** and __ empty",
+            "unclosed `code and **bold",
+            "![](empty) [](also) !",
+        ]
+        for text in samples:
+            nodes = [TextNode(text, TextType.NORMAL)]
+            nodes = split_nodes_image(nodes)
+            nodes = split_nodes_link(nodes)
+            nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+            nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+            nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+            expected = [node for node in nodes if node.text or node.text_type in [TextType.IMAGE, TextType.LINK]]
+            self.assertListEqual(expected, text_to_textnodes(text), text)
+
+    def test_text_to_textnodes_code_hides_delimiters(self):
+        self.assertListEqual(
+            [TextNode("a ", TextType.NORMAL), TextNode("**b** _c_", TextType.CODE)],
+            text_to_textnodes("a `**b** _c_`"),
+        )
+
 class TestMarkdownBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
         md = (
@@ -287,6 +321,50 @@ class TestMarkdownBlocks(unittest.TestCase):
             ],
         )
 
+    def test_fenced_code_keeps_blank_lines(self):
+        md = "Intro\n\n```\nfirst\n\n\nsecond\n```\n\nOutro"
+        self.assertEqual(
+            markdown_to_blocks(md),
+            ["Intro", "```\nfirst\n\n\nsecond\n```", "Outro"],
+        )
+
+    def test_fenced_code_starting_with_blank_line(self):
+        md = "```\n\nx = 1\n\ny\n```"
+        self.assertEqual(markdown_to_blocks(md), ["```\n\nx = 1\n\ny\n```"])
+
+    def test_one_line_fence_is_closed(self):
+        md = "```x = 1```\n\nparagraph\n\n```\ncode\n```"
+        self.assertEqual(markdown_to_blocks(md), ["```x = 1```", "paragraph", "```\ncode\n```"])
+
+    def test_fence_followed_by_text_and_later_code_block(self):
+        md = "```\ncode\n```\nSome text\n\n# Heading\n\nA paragraph.\n\n```\nmore\n```"
+        self.assertEqual(
+            markdown_to_blocks(md),
+            ["```\ncode\n```", "Some text", "# Heading", "A paragraph.", "```\nmore\n```"],
+        )
+        html = markdown_to_html_node(md).to_html()
+        self.assertIn("<h1>Heading</h1><p>A paragraph.</p>", html)
+        self.assertIn("<pre><code>more</code></pre>", html)
+
+    def test_inline_fence_pair_does_not_open_a_fence(self):
+        md = "```x``` starts a paragraph\n\n# Heading\n\n```\ncode\n```"
+        self.assertEqual(markdown_to_blocks(md), ["```x``` starts a paragraph", "# Heading", "```\ncode\n```"])
+
+    def test_unterminated_fence_splits_on_blank_lines(self):
+        md = "```\nnot closed\n\nparagraph"
+        self.assertEqual(markdown_to_blocks(md), ["```\nnot closed", "paragraph"])
+
+    def test_iter_blocks_classifies(self):
+        lines = ["# Title", "", "1. a", "2. b", "", "  ", "> q"]
+        self.assertEqual(
+            [(btype, block) for btype, block in iter_blocks(lines)],
+            [
+                (BlockType.HEADING, ["# Title"]),
+                (BlockType.ORDERED_LIST, ["1. a", "2. b"]),
+                (BlockType.QUOTE, ["> q"]),
+            ],
+        )
+
 
 class TestBlockType(unittest.TestCase):
     def test_heading_block(self):
@@ -396,6 +474,27 @@ print('hi')
         html = node.to_html()
         self.assertEqual(html, "<div><blockquote>hello world</blockquote></div>")
 
+    def test_codeblock_with_blank_lines(self):
+        md = "```\na = 1\n\nb = 2\n```"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html, "<div><pre><code>a = 1\n\nb = 2</code></pre></div>")
+
+    def test_streamed_document_matches_tree(self):
+        docs = [
+            "# Title\n\nSome **text**\n\n- a\n- b\n",
+            "- only\n- a list\n",
+            "1. one\n2. two",
+            "```\ncode\n\nmore\n```\n\n> quote",
+        ]
+        for md in docs:
+            out = io.StringIO()
+            MarkdownDocument(io.StringIO(md)).render_to(out)
+            self.assertEqual(out.getvalue(), markdown_to_html_node(md).to_html(), md)
+
+    def test_streamed_empty_document(self):
+        with self.assertRaises(ValueError):
+            MarkdownDocument(io.StringIO("\n\n")).render_to(io.StringIO())
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,56 @@
+import unittest
+
+from textnode import TextNode, TextType, text_node_to_html_node
+from urls import UrlResolver, is_internal, page_url, resolve_url, rewrite_root_urls
+
+
+class TestResolveUrl(unittest.TestCase):
+    def test_root_relative(self):
+        self.assertEqual(resolve_url("/blog/a", "/site/"), "/site/blog/a")
+        self.assertEqual(resolve_url("/", "../"), "../")
+
+    def test_other_urls_unchanged(self):
+        for url in ("https://x.org/a", "//cdn.example/a.js", "a/b", "#top", ""):
+            self.assertEqual(resolve_url(url, "/site/"), url)
+
+    def test_rewrite_root_urls(self):
+        html = '<a href="/a">/a</a><img src="/i.png"><script src="//cdn/x.js"></script>'
+        self.assertEqual(
+            rewrite_root_urls(html, "/site/"),
+            '<a href="/site/a">/a</a><img src="/site/i.png"><script src="//cdn/x.js"></script>',
+        )
+
+    def test_is_internal(self):
+        for url in ("/blog/", "../a.png", "about.html", "?q=1"):
+            self.assertTrue(is_internal(url), url)
+        for url in ("", "#top", "//cdn.example.com/a.js", "https://example.com", "mailto:a@b.c"):
+            self.assertFalse(is_internal(url), url)
+
+    def test_page_url(self):
+        self.assertEqual(page_url("blog/tom/index.html"), "blog/tom/")
+        self.assertEqual(page_url("index.html"), "")
+        self.assertEqual(page_url("about.html"), "about.html")
+
+    def test_text_nodes_resolve_links_and_images(self):
+        link = text_node_to_html_node(TextNode("a", TextType.LINK, "/a"), "/site/")
+        image = text_node_to_html_node(TextNode("i", TextType.IMAGE, "/i.png"), "../")
+        self.assertEqual(link.to_html(), '<a href="/site/a">a</a>')
+        self.assertEqual(image.to_html(), '<img src="../i.png" alt="i"/>')
+
+
+class TestUrlResolver(unittest.TestCase):
+    def test_basepath(self):
+        self.assertEqual(UrlResolver("/site/").prefix_for("blog/a/index.html"), "/site/")
+
+    def test_absolute(self):
+        resolver = UrlResolver("/site/", site_url="https://example.com/")
+        self.assertEqual(resolver.prefix_for("index.html"), "https://example.com/site/")
+
+    def test_relative(self):
+        resolver = UrlResolver("/site/", relative=True)
+        self.assertEqual(resolver.prefix_for("index.html"), "./")
+        self.assertEqual(resolver.prefix_for("blog/tom/index.html"), "../../")
+
+
+if __name__ == "__main__":
+    unittest.main()
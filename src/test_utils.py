@@ -1,5 +1,7 @@
+import os
 import unittest
-from utils import extract_title
+from fixtures import TempDirTestCase
+from utils import PageGenerationError, extract_title, generate_page, generate_pages
 
 class TestExtractTitle(unittest.TestCase):
     def test_simple_h1(self):
@@ -21,5 +23,51 @@ class TestExtractTitle(unittest.TestCase):
         with self.assertRaises(Exception):
             extract_title(md)
 
+class TestGeneratePages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+
+    def test_parallel_matches_serial(self):
+        pages = []
+        for i in range(6):
+            md = self.write(f"content/p{i}.md", f"# Page {i}\n\nBody **{i}**")
+            pages.append((md, self.template, os.path.join(self.root, "docs", f"p{i}.html")))
+        generate_pages(pages, jobs=1)
+        serial = [self.read(dest) for _, _, dest in pages]
+        generate_pages(pages, jobs=3)
+        self.assertEqual([self.read(dest) for _, _, dest in pages], serial)
+        self.assertEqual(serial[2], "<title>Page 2</title><div><h1>Page 2</h1><p>Body <b>2</b></p></div>")
+
+    def test_minify_covers_page_content(self):
+        template = self.write("layout.html", "<html>\n  <title> {{ Title }} </title>\n  <body>\n{{ Content }}\n  </body>\n</html>")
+        md = self.write("content/q.md", "# Quote\n\n> size.\n> -- J.\n\n<!-- draft -->\n\n```\n  kept  as is\n```")
+        dest = os.path.join(self.root, "docs", "q.html")
+        generate_page(md, template, dest, minify=True)
+        self.assertEqual(
+            self.read(dest),
+            "<html><title>Quote</title><body><div><h1>Quote</h1><blockquote>size. -- J.</blockquote>"
+            "<p></p><pre><code>  kept  as is</code></pre></div></body></html>",
+        )
+
+    def test_minify_after_characters_that_lengthen_when_lowered(self):
+        template = self.write("layout.html", "{{ Content }}")
+        md = self.write("content/i.md", "# " + "İ" * 14 + "\n\n```\ncode\n```\n\nhello world")
+        dest = os.path.join(self.root, "docs", "i.html")
+        generate_page(md, template, dest, minify=True)
+        self.assertEqual(self.read(dest), "<div><h1>" + "İ" * 14 + "</h1><pre><code>code</code></pre><p>hello world</p></div>")
+
+    def test_failure_names_the_page(self):
+        good = self.write("content/good.md", "# Good")
+        bad = self.write("content/bad.md", "no title here")
+        pages = [
+            (good, self.template, os.path.join(self.root, "docs", "good.html")),
+            (bad, self.template, os.path.join(self.root, "docs", "bad.html")),
+        ]
+        for jobs in (1, 2):
+            with self.assertRaises(PageGenerationError) as ctx:
+                generate_pages(pages, jobs=jobs)
+            self.assertEqual(ctx.exception.from_path, bad)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,6 +1,7 @@
 from enum import Enum
 
 from htmlnode import LeafNode, ParentNode
+from urls import resolve_url
 import re
 
 
@@ -22,6 +23,8 @@ class BlockType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "link")
+
     def __init__(self, text: str, text_type: TextType, link: str = None):
         self.text = text
         self.text_type = text_type
@@ -33,7 +36,12 @@ class TextNode:
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.link})"
 
-def text_node_to_html_node(text_node: TextNode) -> LeafNode:
+def text_node_to_html_node(text_node: TextNode, url_prefix: str = "/", assets=None) -> LeafNode:
+    """
+    Converts a TextNode to its HTML leaf. Root-relative link and image URLs
+    are resolved against url_prefix and assets (see urls.resolve_url), and
+    images get width and height when assets knows their size.
+    """
     if text_node.text_type == TextType.NORMAL:
         return LeafNode(None, text_node.text)
     elif text_node.text_type == TextType.BOLD:
@@ -43,9 +51,13 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
     elif text_node.text_type == TextType.CODE:
         return LeafNode('code', text_node.text)
     elif text_node.text_type == TextType.LINK:
-        return LeafNode('a', text_node.text, {'href': text_node.link})
+        return LeafNode('a', text_node.text, {'href': resolve_url(text_node.link, url_prefix, assets)})
     elif text_node.text_type == TextType.IMAGE:
-        return LeafNode('img', None, {'src': text_node.link, 'alt': text_node.text})
+        props = {'src': resolve_url(text_node.link, url_prefix, assets), 'alt': text_node.text}
+        size = assets.size_for(text_node.link) if assets else None
+        if size:
+            props['width'], props['height'] = str(size[0]), str(size[1])
+        return LeafNode('img', None, props)
     else:
         raise ValueError(f"Invalid text type: {text_node.text_type}")
 
@@ -73,21 +85,22 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
                 new_nodes.append(TextNode(segment, text_type))
     return new_nodes
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
 def extract_markdown_images(text):
     """
     Extracts all markdown images from the given text.
     Returns a list of (alt_text, url) tuples.
     """
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    return re.findall(pattern, text)
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text):
     """
     Extracts all markdown links from the given text, ignoring images.
     Returns a list of (anchor_text, url) tuples.
     """
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    return re.findall(pattern, text)
+    return LINK_PATTERN.findall(text)
 
 def split_nodes_image(old_nodes):
     """
@@ -159,129 +172,359 @@ def split_nodes_link(old_nodes):
             new_nodes.append(TextNode(after, TextType.NORMAL))
     return new_nodes
 
+DELIMITER_PATTERN = re.compile(r"`|\*\*|_")
+
+def _scan_delimiters(text, start, end, nodes):
+    """
+    Splits text[start:end] on `, ** and _ in one left-to-right pass.
+    Code spans hide the other delimiters and bold hides _; opening or closing
+    an outer span resets the inner ones, so the result matches applying
+    split_nodes_delimiter for `, ** and _ in that order.
+    """
+    code = bold = italic = False
+    run_start = start
+    for match in DELIMITER_PATTERN.finditer(text, start, end):
+        delimiter = match.group()
+        if code and delimiter != "`" or bold and delimiter == "_":
+            continue
+        if run_start < match.start():
+            nodes.append(TextNode(text[run_start:match.start()], _span_type(code, bold, italic)))
+        if delimiter == "`":
+            code = not code
+            bold = italic = False
+        elif delimiter == "**":
+            bold = not bold
+            italic = False
+        else:
+            italic = not italic
+        run_start = match.end()
+    if run_start < end:
+        nodes.append(TextNode(text[run_start:end], _span_type(code, bold, italic)))
+
+def _span_type(code, bold, italic):
+    if code:
+        return TextType.CODE
+    if bold:
+        return TextType.BOLD
+    if italic:
+        return TextType.ITALIC
+    return TextType.NORMAL
+
 def text_to_textnodes(text):
     """
     Converts markdown text to a list of TextNode objects,
     appropriately splitting by images, links, code, bold, and italics.
+    Scans the text once: images take precedence over links, and the text
+    between them is split on inline delimiters by _scan_delimiters.
     """
-    # Start with one node containing all text as NORMAL
-    nodes = [TextNode(text, TextType.NORMAL)]
-    # Images first (so they aren't processed by link/bold/italic)
-    nodes = split_nodes_image(nodes)
-    # Links next
-    nodes = split_nodes_link(nodes)
-    # Code (using backticks)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    # Bold (**)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    # Italic (_)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    return [node for node in nodes if node.text or node.text_type in [TextType.IMAGE, TextType.LINK]]
+    nodes = []
+    pos = 0
+    end = len(text)
+    images = IMAGE_PATTERN.finditer(text)
+    image = next(images, None)
+    while pos < end or image is not None:
+        gap_end = image.start() if image is not None else end
+        link = LINK_PATTERN.search(text, pos, gap_end)
+        if link is not None:
+            _scan_delimiters(text, pos, link.start(), nodes)
+            nodes.append(TextNode(link.group(1), TextType.LINK, link.group(2)))
+            pos = link.end()
+            continue
+        _scan_delimiters(text, pos, gap_end, nodes)
+        if image is None:
+            break
+        nodes.append(TextNode(image.group(1), TextType.IMAGE, image.group(2)))
+        pos = image.end()
+        image = next(images, None)
+    return nodes
 
-def markdown_to_blocks(markdown: str) -> list:
+FENCE = "```"
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+
+
+def _classify_block(lines) -> BlockType:
     """
-    Splits a markdown string into blocks, using double newlines as separators.
-    Strips whitespace from each block and removes any empty blocks.
+    Classifies a stripped block given as its list of lines.
     """
-    # Split by two or more newlines, preserving blocks separated by blank lines
-    blocks = markdown.split('\n\n')
-    # Strip whitespace from each block, and filter out any that become empty
-    return [block.strip() for block in blocks if block.strip()]
-
-def block_to_block_type(block: str) -> BlockType:
-    # Heading: 1-6 '#' at start
-    if re.match(r"^#{1,6} ", block):
+    first = lines[0]
+    if HEADING_PATTERN.match(first):
         return BlockType.HEADING
-    # Code block: starts and ends with ```
-    if block.startswith("```") and block.endswith("```"):
+    if first.startswith(FENCE) and lines[-1].endswith(FENCE):
         return BlockType.CODE
-    # Quote: every line starts with '>'
-    lines = block.splitlines()
     if all(line.startswith(">") for line in lines):
         return BlockType.QUOTE
-    # Unordered list: every line starts with '- '
     if all(line.startswith("- ") for line in lines):
         return BlockType.UNORDERED_LIST
-    # Ordered list: each line starts with incrementing '1. ', '2. ', ...
-    if all(re.match(rf"{i+1}\. ", lines[i]) for i in range(len(lines))):
+    if all(line.startswith(f"{i}. ") for i, line in enumerate(lines, 1)):
         return BlockType.ORDERED_LIST
-    # Else: paragraph
     return BlockType.PARAGRAPH
 
 
-def text_to_children(text):
+def _finish_block(lines):
+    """
+    Strips the block the way str.strip() would strip the joined text:
+    drops blank edge lines and edge whitespace, keeping inner lines intact.
+    """
+    start, end = 0, len(lines)
+    while start < end and not lines[start].strip():
+        start += 1
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    if start == end:
+        return None
+    lines = lines[start:end]
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    return lines
+
+
+def iter_blocks(lines):
+    """
+    Scans markdown lines (without line endings) once and yields
+    (BlockType, block_lines) for every block.
+    Blocks are separated by empty lines, except inside a fenced code block,
+    which runs until its closing fence even across blank lines and ends
+    there. A fence that never closes is split at empty lines like ordinary text.
+    """
+    block = []
+    # None outside a fenced block, True while its fence is open, False once closed
+    fence = None
+    started = False
+    for line in lines:
+        if not line:
+            if fence:
+                block.append(line)
+                continue
+            yield from _emit_block(block)
+            block = []
+            fence = None
+            started = False
+            continue
+        stripped = line.strip()
+        if fence is False and stripped:
+            # Text right after a closing fence starts the next block
+            yield from _emit_block(block)
+            block = []
+            fence = None
+            started = False
+        block.append(line)
+        if not started:
+            if stripped:
+                # The first non-blank line decides whether this is a fence
+                started = True
+                fence = True if _opens_fence(stripped) else None
+        elif fence and stripped.endswith(FENCE):
+            fence = False
+
+    if fence:
+        # Unterminated fence: fall back to splitting on empty lines
+        for piece in _split_on_empty(block):
+            yield from _emit_block(piece)
+        return
+    yield from _emit_block(block)
+
+
+def _emit_block(lines):
+    finished = _finish_block(lines)
+    if finished:
+        yield _classify_block(finished), finished
+
+
+def _opens_fence(stripped):
+    """
+    Whether a stripped line opens a fenced block: a fence, optionally followed
+    by an info string without backticks. ```code``` on one line doesn't.
+    """
+    return stripped.startswith(FENCE) and "`" not in stripped[len(FENCE):]
+
+
+def _split_on_empty(lines):
+    piece = []
+    for line in lines:
+        if line:
+            piece.append(line)
+        elif piece:
+            yield piece
+            piece = []
+    if piece:
+        yield piece
+
+
+def markdown_to_blocks(markdown: str) -> list:
+    """
+    Splits a markdown string into blocks, using blank lines as separators.
+    Strips whitespace from each block and removes any empty blocks.
+    Fenced code blocks are kept whole even if they contain blank lines.
+    """
+    return ["\n".join(lines) for _, lines in iter_blocks(markdown.split("\n"))]
+
+def block_to_block_type(block: str) -> BlockType:
+    return _classify_block(block.splitlines())
+
+
+def text_to_children(text, url_prefix="/"):
     """
     Converts a text string with inline markdown to a list of HTMLNode children.
     """
     textnodes = text_to_textnodes(text)
-    return [text_node_to_html_node(node) for node in textnodes]
+    return [text_node_to_html_node(node, url_prefix) for node in textnodes]
+
+
+def _paragraph_nodes(lines, to_children=text_to_children):
+    paragraph_text = ' '.join(line.strip() for line in lines)
+    return [ParentNode("p", to_children(paragraph_text))]
+
+def _heading_nodes(lines, to_children=text_to_children):
+    # Support multiple headings per block
+    nodes = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        level = 0
+        while level < len(line) and line[level] == "#":
+            level += 1
+        content = line[level:].strip()
+        nodes.append(ParentNode(f"h{level}", to_children(content)))
+    return nodes
+
+def _code_nodes(lines, to_children=text_to_children):
+    # Remove first and last line if they only contain ```
+    # (don't remove code lines actually containing ```)
+    if lines and lines[0].strip("`") == "":
+        lines = lines[1:]
+    if lines and lines[-1].strip("`") == "":
+        lines = lines[:-1]
+    code_leaf = LeafNode("code", "\n".join(lines))
+    return [ParentNode("pre", [code_leaf])]
+
+def _quote_nodes(lines, to_children=text_to_children):
+    content = " ".join([line[1:].lstrip() if line.startswith(">") else line for line in lines])
+    # No <p> wrapping, as per expectations
+    return [ParentNode("blockquote", to_children(content))]
+
+def _unordered_list_nodes(lines, to_children=text_to_children):
+    items = [ParentNode("li", to_children(line.lstrip("-* ").strip())) for line in lines if line.strip()]
+    return [ParentNode("ul", items)]
+
+def _ordered_list_nodes(lines, to_children=text_to_children):
+    items = []
+    for line in lines:
+        if not line.strip():
+            continue
+        # Drop the "N." prefix
+        after_dot = line[line.find('.')+1:] if "." in line else line
+        items.append(ParentNode("li", to_children(after_dot.strip())))
+    return [ParentNode("ol", items)]
+
+BLOCK_HANDLERS = {
+    BlockType.PARAGRAPH: _paragraph_nodes,
+    BlockType.HEADING: _heading_nodes,
+    BlockType.CODE: _code_nodes,
+    BlockType.QUOTE: _quote_nodes,
+    BlockType.UNORDERED_LIST: _unordered_list_nodes,
+    BlockType.ORDERED_LIST: _ordered_list_nodes,
+}
+
+
+def block_to_html_nodes(btype: BlockType, lines, to_children=text_to_children) -> list:
+    """
+    Converts one classified block to the HTMLNodes it renders as.
+    to_children converts inline markdown text to child nodes.
+    """
+    return BLOCK_HANDLERS[btype](lines, to_children)
 
 def markdown_to_html_node(markdown):
     """
     Converts a Markdown document into a single Parent HTMLNode containing all child HTMLNodes.
     """
-    blocks = markdown_to_blocks(markdown)
     children = []
-    # Determine outer parent: if only one child and it's a list, don't wrap it in a div
-    # Otherwise, always wrap in <div> (per test expectations)
-    for block in blocks:
-        btype = block_to_block_type(block)
-        if btype == BlockType.PARAGRAPH:
-            paragraph_text = ' '.join(line.strip() for line in block.splitlines())
-            node = ParentNode("p", text_to_children(paragraph_text))
-            children.append(node)
-        elif btype == BlockType.HEADING:
-            # Support multiple headings per block (split lines)
-            for line in block.splitlines():
-                line = line.strip()
-                if not line:
-                    continue
-                level = 0
-                while level < len(line) and line[level] == "#":
-                    level += 1
-                content = line[level:].strip()
-                node = ParentNode(f"h{level}", text_to_children(content))
-                children.append(node)
-        elif btype == BlockType.CODE:
-            # Remove the starting and ending ```
-            stripped = block.strip()
-            lines = stripped.splitlines()
-            # Remove first and last line if they only contain ```
-            # (don't remove code lines actually containing ```)
-            if lines and lines[0].strip("`") == "":
-                lines = lines[1:]
-            if lines and lines[-1].strip("`") == "":
-                lines = lines[:-1]
-            content = "\n".join(lines)
-            code_leaf = LeafNode("code", content)
-            pre = ParentNode("pre", [code_leaf])
-            children.append(pre)
-        elif btype == BlockType.QUOTE:
-            content = " ".join([line[1:].lstrip() if line.startswith(">") else line for line in block.splitlines()])
-            # No <p> wrapping, as per expectations
-            node = ParentNode("blockquote", text_to_children(content))
-            children.append(node)
-        elif btype == BlockType.UNORDERED_LIST:
-            lines = [line for line in block.splitlines() if line.strip()]
-            items = [ParentNode("li", text_to_children(line.lstrip("-* ").strip())) for line in lines]
-            node = ParentNode("ul", items)
-            children.append(node)
-        elif btype == BlockType.ORDERED_LIST:
-            lines = [line for line in block.splitlines() if line.strip()]
-            items = []
-            for line in lines:
-                # Match ^\d+\.\s+
-                after_dot = line
-                if "." in line:
-                    after_dot = line[line.find('.')+1:]
-                items.append(ParentNode("li", text_to_children(after_dot.strip())))
-            node = ParentNode("ol", items)
-            children.append(node)
-        else:
-            # fallback to paragraph
-            node = ParentNode("p", text_to_children(block))
-            children.append(node)
+    for btype, lines in iter_blocks(markdown.split("\n")):
+        children.extend(block_to_html_nodes(btype, lines))
     # For document root: if there is exactly 1 list and nothing else, return the list node raw, otherwise wrap in div.
     if len(children) == 1 and children[0].tag in ("ol", "ul"):
         return children[0]
-    return ParentNode("div", children)
\ No newline at end of file
+    return ParentNode("div", children)
+
+
+class MarkdownDocument:
+    """
+    A markdown document rendered block by block straight into a writer.
+    lines may be any iterable of lines (e.g. an open file), so only the block
+    being converted is ever held in memory. Renders the same HTML as
+    markdown_to_html_node(markdown).to_html().
+    If given, on_textnodes is called with every list of inline TextNodes as it
+    is parsed, so callers can collect links, words, etc. without re-parsing,
+    and trace (a buildtrace.PageTrace) is charged the time of each stage.
+    Root-relative link and image URLs are resolved against url_prefix and
+    assets, and on_block, if given, is called with each top-level node before
+    it is rendered.
+    """
+
+    def __init__(self, lines, on_textnodes=None, trace=None, url_prefix="/", on_block=None, assets=None):
+        self.lines = lines
+        self.on_textnodes = on_textnodes
+        self.trace = trace
+        self.url_prefix = url_prefix
+        self.on_block = on_block
+        self.assets = assets
+
+    def _to_children(self, text):
+        textnodes = text_to_textnodes(text)
+        if self.on_textnodes is not None:
+            self.on_textnodes(textnodes)
+        return [text_node_to_html_node(node, self.url_prefix, self.assets) for node in textnodes]
+
+    def render_to(self, out):
+        resolves = self.url_prefix != "/" or self.assets
+        to_children = self._to_children if self.on_textnodes or resolves else text_to_children
+        blocks = iter_blocks(line.rstrip("\n") for line in self.lines)
+        convert = block_to_html_nodes
+
+        def render(node):
+            node.render_to(out)
+
+        if self.trace is not None:
+            blocks = self.trace.timed_iter("parse_blocks", blocks)
+            convert = self.trace.timed("parse_blocks", convert)
+            to_children = self.trace.timed("parse_inline", to_children)
+            out = self.trace.timed_writer(out)
+            render = self.trace.timed("render", render)
+
+        nodes = (node for btype, lines in blocks for node in convert(btype, lines, to_children))
+        if self.on_block is not None:
+            nodes = self._tap(nodes)
+        write_document(nodes, out, render)
+
+    def _tap(self, nodes):
+        for node in nodes:
+            self.on_block(node)
+            yield node
+
+
+def write_document(nodes, out, render=None):
+    """
+    Writes a document's top-level block nodes to out, consuming them lazily.
+    Like markdown_to_html_node, a document that is a single list renders
+    without the <div> wrapper, so the first node is held back until we know
+    whether more follow.
+    """
+    render = render or (lambda node: node.render_to(out))
+    nodes = iter(nodes)
+    first = next(nodes, None)
+    if first is None:
+        raise ValueError("Children cannot be None or an empty list")
+    pending = [first]
+    if first.tag in ("ol", "ul"):
+        second = next(nodes, None)
+        if second is None:
+            render(first)
+            return
+        pending.append(second)
+
+    out.write("<div>")
+    for node in pending:
+        render(node)
+    for node in nodes:
+        render(node)
+    out.write("</div>")
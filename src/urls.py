@@ -0,0 +1,92 @@
+import re
+
+ROOT_URL_ATTRIBUTE = re.compile(r'\b(href|src)="(/[^"]*)"')
+URL_SCHEME = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*:")
+
+
+def is_root_relative(url: str) -> bool:
+    return url.startswith("/") and not url.startswith("//")
+
+
+def is_internal(url: str) -> bool:
+    """
+    Whether url points into the site: root-relative (/a) or relative (a, ../a)
+    URLs, but not absolute (https://...), protocol-relative (//...) or
+    scheme (mailto:...) ones, nor a bare #fragment.
+    """
+    return bool(url) and not url.startswith(("#", "//")) and not URL_SCHEME.match(url)
+
+
+def split_path(url: str):
+    """
+    Splits a root-relative URL into its path, without the leading /, and its
+    query and fragment: /a.css?v=1#x -> ("a.css", "?v=1#x").
+    """
+    end = len(url)
+    for mark in "?#":
+        index = url.find(mark)
+        if index != -1:
+            end = min(end, index)
+    return url[1:end], url[end:]
+
+
+def resolve_url(url: str, prefix: str, assets=None) -> str:
+    """
+    Points a root-relative URL (/images/a.png) at prefix, and at its
+    fingerprinted name if assets (an assets.AssetManifest) has one; other URLs,
+    including protocol-relative ones (//cdn...), are returned unchanged.
+    """
+    if (prefix == "/" and not assets) or not url or not is_root_relative(url):
+        return url
+    if assets:
+        path, rest = split_path(url)
+        url = "/" + assets.get(path, path) + rest
+    return prefix + url[1:]
+
+
+def rewrite_root_urls(html: str, prefix: str, assets=None) -> str:
+    """
+    Rewrites root-relative href/src attributes in a fragment of markup,
+    used for template literals, which aren't built from nodes.
+    """
+    if prefix == "/" and not assets:
+        return html
+    return ROOT_URL_ATTRIBUTE.sub(lambda match: f'{match.group(1)}="{resolve_url(match.group(2), prefix, assets)}"', html)
+
+
+def page_url(rel_path: str) -> str:
+    """
+    The URL of an output, relative to the site root: blog/tom/index.html -> blog/tom/.
+    """
+    url = rel_path.replace("\\", "/")
+    if url == "index.html" or url.endswith("/index.html"):
+        url = url[: -len("index.html")]
+    return url
+
+
+class UrlResolver:
+    """
+    Decides what a page's root-relative URLs become:
+    basepath mode prefixes them with the basepath, absolute mode with the full
+    site URL, and relative mode with the ../ steps back to the site root.
+    """
+
+    def __init__(self, basepath="/", site_url=None, relative=False):
+        self.basepath = basepath
+        self.site_url = site_url.rstrip("/") if site_url else None
+        self.relative = relative
+
+    def prefix_for(self, page_path: str) -> str:
+        """
+        page_path is the page's output path relative to the output root,
+        e.g. blog/tom/index.html.
+        """
+        if self.relative:
+            depth = page_path.replace("\\", "/").strip("/").count("/")
+            return "../" * depth or "./"
+        if self.site_url:
+            return self.site_url + self.basepath
+        return self.basepath
+
+    def settings(self) -> dict:
+        return {"basepath": self.basepath, "site_url": self.site_url, "relative_urls": self.relative}
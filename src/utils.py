@@ -1,31 +1,206 @@
-import os
-from textnode import markdown_to_html_node
+import contextlib
+import io
+from concurrent.futures import ProcessPoolExecutor
+from buildtrace import start_page_trace
+from minify import HtmlMinifier
+from outputs import OutputFile, ensure_dirs
+from parsecache import ParseCacheError
+from search import TermCollector
+from template import load_template
+from textnode import MarkdownDocument, TextType
+from urls import is_internal
 
 def extract_title(markdown):
-    for line in markdown.splitlines():
+    """
+    Returns the text of the first h1 in markdown, which may be a string or
+    an iterable of lines such as an open file (read only up to the title).
+    """
+    lines = markdown.splitlines() if isinstance(markdown, str) else markdown
+    for line in lines:
         if line.strip().startswith("# "):
             return line.strip()[1:].strip()
     raise Exception("No h1 header found in markdown!")
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}, basepath={basepath}")
+def generate_page(
+    from_path,
+    template_path,
+    dest_path,
+    url_prefix="/",
+    trace=None,
+    parse_cache=None,
+    assets=None,
+    minify=False,
+    index_text=False,
+):
+    """
+    Renders from_path through the template into dest_path, pointing
+    root-relative URLs in the page and the template at url_prefix.
+    Returns a record of the page's dependencies: the files it was built from
+    ("inputs") and the root-relative URLs it links to ("references"), the
+    other internal URLs it links to ("relative_links") and embeds
+    ("images"), its "title", and whether dest_path was rewritten ("changed") and the hash of
+    its content ("hash"): the page is written atomically, and not at all if
+    its content is what dest_path already holds.
+    With a buildtrace.PageTrace, the time of each stage is recorded in it.
+    With a parsecache.ParseCache, an unchanged source is rendered from its cached parse.
+    With an assets.AssetManifest, references to static files use their fingerprinted names.
+    With minify set, the whole page is written through a minify.HtmlMinifier.
+    With index_text set, the record also has the search terms in the page's
+    text with their counts ("terms", see search.tokenize).
+    """
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}, url prefix={url_prefix}")
+    stage = trace.stage if trace is not None else (lambda name: contextlib.nullcontext())
 
-    with open(from_path, "r", encoding="utf-8") as f:
-        markdown = f.read()
+    with stage("read"):
+        template = load_template(template_path, url_prefix, assets)
+        with open(from_path, "r", encoding="utf-8") as f:
+            title = extract_title(f)
 
-    with open(template_path, "r", encoding="utf-8") as f:
-        template = f.read()
+    # The source is streamed block by block, so memory is bounded by the largest block.
+    # URLs are resolved as link and image nodes are built, not by rewriting the output
+    references = set()
+    relative_links = set()
+    images = set()
 
-    content_html = markdown_to_html_node(markdown).to_html()
-    title = extract_title(markdown)
+    terms = TermCollector() if index_text else None
 
-    out_html = template.replace("{{ Title }}", title).replace("{{ Content }}", content_html)
+    def collect_references(textnodes):
+        for node in textnodes:
+            if node.text_type == TextType.LINK and node.link and node.link.startswith("/"):
+                references.add(node.link)
+            elif node.text_type == TextType.LINK and is_internal(node.link):
+                relative_links.add(node.link)
+            elif node.text_type == TextType.IMAGE and is_internal(node.link):
+                images.add(node.link)
+        if terms is not None:
+            terms(textnodes)
 
-    # Adjust links for basepath
-    out_html = out_html.replace('href="/', f'href="{basepath}')
-    out_html = out_html.replace('src="/', f'src="{basepath}')
+    def render(cache):
+        with open(from_path, "r", encoding="utf-8") as src, OutputFile(dest_path) as f, stage("template"):
+            if cache is None:
+                content = MarkdownDocument(
+                    src, on_textnodes=collect_references, trace=trace, url_prefix=url_prefix, assets=assets
+                )
+            else:
+                content = cache.document(
+                    from_path,
+                    src,
+                    on_textnodes=collect_references,
+                    trace=trace,
+                    url_prefix=url_prefix,
+                    assets=assets,
+                    all_textnodes=index_text,
+                )
+            out = HtmlMinifier(f) if minify else f
+            template.render_to(out, {"Title": title, "Content": content})
+            if minify:
+                out.close()
+        return f
 
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    try:
+        output = render(parse_cache)
+    except ParseCacheError as e:
+        print(f"Ignoring parse cache entry: {e}")
+        parse_cache.discard(from_path)
+        references.clear()
+        relative_links.clear()
+        images.clear()
+        if terms is not None:
+            terms.words.clear()
+        output = render(None)
+    if not output.changed:
+        print(f"Unchanged {dest_path}")
 
-    with open(dest_path, "w", encoding="utf-8") as f:
-        f.write(out_html)
\ No newline at end of file
+    record = {
+        "inputs": [from_path, template_path],
+        "references": sorted(references),
+        "relative_links": sorted(relative_links),
+        "images": sorted(images),
+        "title": title,
+        "changed": output.changed,
+        "hash": output.hash,
+    }
+    if terms is not None:
+        record["terms"] = terms.terms()
+    return record
+
+
+class PageGenerationError(Exception):
+    def __init__(self, from_path, message):
+        super().__init__(f"{from_path}: {message}")
+        self.from_path = from_path
+        self.message = message
+
+    def __reduce__(self):
+        return (PageGenerationError, (self.from_path, self.message))
+
+
+def _generate_page_captured(task):
+    """
+    Worker entry point: generates one page and returns everything it logged,
+    so the parent can print logs in a deterministic order, with the page record.
+    """
+    from_path, template_path, dest_path, url_prefix, traced, parse_cache, assets, minify, index_text = task
+    log = io.StringIO()
+    trace = start_page_trace(from_path) if traced else None
+    try:
+        with contextlib.redirect_stdout(log):
+            record = generate_page(
+                from_path, template_path, dest_path, url_prefix, trace, parse_cache, assets, minify, index_text
+            )
+    except Exception as e:
+        raise PageGenerationError(from_path, f"{type(e).__name__}: {e}") from None
+    finally:
+        if trace is not None:
+            trace.finish()
+    if trace is not None:
+        record["trace"] = trace.to_dict()
+    return log.getvalue(), record
+
+
+def generate_pages(
+    pages, url_prefix="/", jobs=1, trace=False, parse_cache=None, assets=None, minify=False, index_text=False
+):
+    """
+    Generates every (from_path, template_path, dest_path) page in pages.
+    url_prefix is either one prefix for every page or a function of dest_path,
+    e.g. urls.UrlResolver.prefix_for for relative URLs. index_text is likewise
+    one flag for every page or a function of from_path (see generate_page).
+    With jobs > 1 the pages are spread over a process pool; logs are printed
+    in page order and the first failing page raises PageGenerationError.
+    Returns {from_path: record} with the record generate_page returned for each page,
+    including its stage timings under "trace" when trace is set.
+    """
+    prefix_for = url_prefix if callable(url_prefix) else (lambda dest_path: url_prefix)
+    index_for = index_text if callable(index_text) else (lambda from_path: index_text)
+    tasks = [
+        (
+            from_path,
+            template_path,
+            dest_path,
+            prefix_for(dest_path),
+            trace,
+            parse_cache,
+            assets,
+            minify,
+            index_for(from_path),
+        )
+        for from_path, template_path, dest_path in pages
+    ]
+    # Output directories are created here in one pass, not once per page
+    ensure_dirs(task[2] for task in tasks)
+    records = {}
+    if jobs <= 1 or len(tasks) <= 1:
+        results = map(_generate_page_captured, tasks)
+        for task, (log, record) in zip(tasks, results):
+            print(log, end="")
+            records[task[0]] = record
+        return records
+
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(_generate_page_captured, tasks, chunksize=chunksize)
+        for task, (log, record) in zip(tasks, results):
+            print(log, end="")
+            records[task[0]] = record
+    return records